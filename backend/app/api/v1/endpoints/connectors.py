@@ -3,21 +3,28 @@ Infrastructure Connection Management API
 Manage connections to user environments (SSH, databases, APIs, cloud)
 """
 from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse, Response
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.core.database import get_db
+from app.api.routing import ORJSONRoute
 from app.controllers.connector_controller import (
     ConnectorController,
     CredentialCreate,
     InfrastructureConnectionCreate,
+    InfrastructureConnectionUpdate,
     TestCommandRequest
 )
 
-router = APIRouter()
+router = APIRouter(route_class=ORJSONRoute)
+
+# Endpoints backed only by the synchronous SQLAlchemy Session are plain ``def``
+# so FastAPI runs them in its threadpool instead of blocking the event loop;
+# only the endpoints that await connector I/O stay ``async def``.
 
 
 @router.post("/credentials")
-async def create_credential(
+def create_credential(
     credential: CredentialCreate,
     db: Session = Depends(get_db)
 ):
@@ -26,18 +33,23 @@ async def create_credential(
     return controller.create_credential(credential)
 
 
-@router.get("/credentials")
-async def list_credentials(
+@router.get("/credentials", response_class=ORJSONResponse)
+def list_credentials(
     db: Session = Depends(get_db),
     environment: Optional[str] = None
 ):
-    """List all credentials"""
+    """
+    List all credentials
+    
+    The controller returns a ready ORJSONResponse, so FastAPI skips response
+    validation and jsonable_encoder; do not add response_model here.
+    """
     controller = ConnectorController(db)
     return controller.list_credentials(environment)
 
 
 @router.post("/infrastructure-connections")
-async def create_infrastructure_connection(
+def create_infrastructure_connection(
     connection: InfrastructureConnectionCreate,
     db: Session = Depends(get_db)
 ):
@@ -46,30 +58,34 @@ async def create_infrastructure_connection(
     return controller.create_infrastructure_connection(connection)
 
 
-@router.get("/infrastructure-connections")
-async def list_infrastructure_connections(
+@router.get("/infrastructure-connections", response_class=ORJSONResponse)
+def list_infrastructure_connections(
     db: Session = Depends(get_db),
     connection_type: Optional[str] = None,
     environment: Optional[str] = None
 ):
-    """List all infrastructure connections"""
+    """
+    List all infrastructure connections
+    
+    Returned as a ready ORJSONResponse (no response_model / validation pass).
+    """
     controller = ConnectorController(db)
     return controller.list_infrastructure_connections(environment, connection_type)
 
 
 @router.put("/infrastructure-connections/{connection_id}")
-async def update_infrastructure_connection(
+def update_infrastructure_connection(
     connection_id: int,
-    connection: InfrastructureConnectionCreate,
+    connection: InfrastructureConnectionUpdate,
     db: Session = Depends(get_db)
 ):
-    """Update an existing infrastructure connection"""
+    """Update an existing infrastructure connection (only fields sent are changed)"""
     controller = ConnectorController(db)
     return controller.update_infrastructure_connection(connection_id, connection)
 
 
 @router.delete("/infrastructure-connections/{connection_id}")
-async def delete_infrastructure_connection(
+def delete_infrastructure_connection(
     connection_id: int,
     db: Session = Depends(get_db)
 ):
@@ -79,7 +95,7 @@ async def delete_infrastructure_connection(
 
 
 @router.post("/infrastructure-connections/{connection_id}/test")
-async def test_infrastructure_connection(
+def test_infrastructure_connection(
     connection_id: int,
     db: Session = Depends(get_db)
 ):
@@ -113,14 +129,14 @@ async def test_command_on_vm(
     return await controller.test_command_on_vm(connection_id, request)
 
 
-@router.get("/connectors/monitoring")
+@router.get("/connectors/monitoring", response_class=Response)
 async def list_monitoring_connectors(db: Session = Depends(get_db)):
     """List available monitoring tool connectors"""
     controller = ConnectorController(db)
     return controller.list_monitoring_connectors()
 
 
-@router.get("/connectors/ticketing")
+@router.get("/connectors/ticketing", response_class=Response)
 async def list_ticketing_connectors(db: Session = Depends(get_db)):
     """List available ticketing tool connectors"""
     controller = ConnectorController(db)
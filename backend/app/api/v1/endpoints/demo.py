@@ -7,6 +7,7 @@ from typing import Optional
 import json
 import hashlib
 
+from app.core.config import ensure_upload_dir
 from app.core.database import get_db
 from app.models.user import User
 from app.services.auth import get_current_user
@@ -26,6 +27,7 @@ async def upload_demo_file(
 ):
     """Upload and process a demo file"""
     try:
+        ensure_upload_dir()
         ingestion_service = IngestionService()
         
         # Process the file (using tenant_id = 1 for demo)
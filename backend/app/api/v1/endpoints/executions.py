@@ -4,7 +4,7 @@ Execution tracking and orchestration API endpoints
 from typing import Any, Dict, List, Optional, Literal
 import asyncio
 
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, status, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, Response, WebSocket, WebSocketDisconnect, status, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 
@@ -110,8 +110,12 @@ class SessionControlRequest(BaseModel):
 
 
 @router.post("/demo/sessions", response_model=ExecutionSessionResponse)
-async def create_execution_session(data: ExecutionSessionCreate, db: Session = Depends(get_db)):
-    """Create a new execution session for a runbook"""
+async def create_execution_session(
+    data: ExecutionSessionCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """Create a new execution session for a runbook (execution auto-starts after the response)"""
     controller = ExecutionController(db, tenant_id=data.tenant_id or 1)
     return await controller.create_execution_session(
         runbook_id=data.runbook_id,
@@ -119,12 +123,13 @@ async def create_execution_session(data: ExecutionSessionCreate, db: Session = D
         ticket_id=data.ticket_id,
         user_id=data.user_id,
         metadata=data.metadata,
-        idempotency_key=data.idempotency_key
+        idempotency_key=data.idempotency_key,
+        background_tasks=background_tasks
     )
 
 
 @router.get("/demo/sessions/{session_id}", response_model=ExecutionSessionResponse)
-async def get_execution_session(session_id: int, db: Session = Depends(get_db)):
+def get_execution_session(session_id: int, db: Session = Depends(get_db)):
     """Get execution session details with all steps"""
     try:
         controller = ExecutionController(db, tenant_id=1)  # Demo tenant
@@ -143,18 +148,26 @@ async def get_execution_session(session_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/demo/sessions/{session_id}/events", response_model=List[ExecutionEventResponse])
-async def list_session_events(
+def list_session_events(
     session_id: int,
+    response: Response,
     since_id: Optional[int] = None,
     limit: int = 200,  # Increased default limit
     db: Session = Depends(get_db),
 ):
-    """Return recorded execution events for a session."""
+    """
+    Return recorded execution events for a session.
+    
+    The X-Next-Since-Id header carries the cursor for the next poll.
+    """
     try:
         controller = ExecutionController(db, tenant_id=1)  # Demo tenant
         events = controller.list_session_events(session_id, since_id, limit)
-        if events is None:
+        if not events:
+            if since_id is not None:
+                response.headers["X-Next-Since-Id"] = str(since_id)
             return []
+        response.headers["X-Next-Since-Id"] = str(events[-1]["id"])
         return [ExecutionEventResponse(**event) for event in events]
     except Exception as e:
         logger.error(f"Error listing events for session {session_id}: {e}", exc_info=True)
@@ -221,7 +234,7 @@ async def control_execution_session(
 
 
 @router.post("/demo/sessions/{session_id}/complete")
-async def complete_execution_session(
+def complete_execution_session(
     session_id: int,
     feedback: ExecutionFeedbackCreate,
     db: Session = Depends(get_db)
@@ -239,7 +252,7 @@ async def complete_execution_session(
 
 
 @router.post("/demo/sessions/{session_id}/abandon")
-async def abandon_execution_session(
+def abandon_execution_session(
     session_id: int,
     reason: Optional[str] = None,
     db: Session = Depends(get_db)
@@ -250,35 +263,21 @@ async def abandon_execution_session(
 
 
 @router.get("/demo/runbooks/{runbook_id}/executions", response_model=ExecutionHistoryResponse)
-async def get_runbook_execution_history(runbook_id: int, db: Session = Depends(get_db)):
+def get_runbook_execution_history(runbook_id: int, db: Session = Depends(get_db)):
     """Get all execution sessions for a specific runbook"""
     controller = ExecutionController(db, tenant_id=1)  # Demo tenant
     return ExecutionHistoryResponse(**controller.get_runbook_execution_history(runbook_id))
 
 
 @router.get("/demo/executions", response_model=ExecutionHistoryResponse)
-async def list_all_executions(
+def list_all_executions(
     limit: int = 50,
     offset: int = 0,
     db: Session = Depends(get_db)
 ):
-    """Get all execution sessions (paginated)"""
-    try:
-        controller = ExecutionController(db, tenant_id=1)  # Demo tenant
-        result = controller.list_all_executions(limit, offset)
-        # Ensure result is a dict with 'sessions' key
-        if not isinstance(result, dict):
-            result = {"sessions": []}
-        if "sessions" not in result:
-            result = {"sessions": result if isinstance(result, list) else []}
-        return ExecutionHistoryResponse(**result)
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except Exception as e:
-        logger.exception(f"Error in list_all_executions: {e}", exc_info=True)
-        # Return empty result instead of crashing
-        return ExecutionHistoryResponse(sessions=[])
+    """Get all execution sessions (paginated); 503 with Retry-After while the DB is failing"""
+    controller = ExecutionController(db, tenant_id=1)  # Demo tenant
+    return ExecutionHistoryResponse(**controller.list_all_executions(limit, offset))
 
 
 @router.websocket("/ws/sessions/{session_id}")
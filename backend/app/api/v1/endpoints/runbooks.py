@@ -2,6 +2,7 @@
 Runbook API endpoints
 """
 from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.responses import ORJSONResponse, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
@@ -259,8 +260,8 @@ async def debug_yaml_generation(
     return debug_info
 
 
-@router.get("/demo", response_model=List[RunbookResponse])
-@router.get("/demo/", response_model=List[RunbookResponse])
+@router.get("/demo", response_class=ORJSONResponse, responses={200: {"model": List[RunbookResponse]}})
+@router.get("/demo/", response_class=ORJSONResponse, responses={200: {"model": List[RunbookResponse]}})
 async def list_runbooks_demo(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
@@ -269,11 +270,7 @@ async def list_runbooks_demo(
     """List runbooks for demo tenant"""
     try:
         controller = RunbookController(db, tenant_id=1)  # Demo tenant
-        result = controller.list_runbooks(skip, limit)
-        # Ensure result is a list
-        if not isinstance(result, list):
-            result = []
-        return result
+        return await controller.list_runbooks(skip, limit)
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
@@ -282,17 +279,17 @@ async def list_runbooks_demo(
         logger = get_logger(__name__)
         logger.exception(f"Error in list_runbooks_demo: {e}", exc_info=True)
         # Return empty list instead of crashing
-        return []
+        return ORJSONResponse([])
 
 
-@router.get("/demo/{runbook_id}", response_model=RunbookResponse)
+@router.get("/demo/{runbook_id}", response_class=Response, responses={200: {"model": RunbookResponse}})
 async def get_runbook_demo(
     runbook_id: int,
     db: Session = Depends(get_db)
 ):
     """Get a specific runbook by ID for demo tenant"""
     controller = RunbookController(db, tenant_id=1)  # Demo tenant
-    return controller.get_runbook(runbook_id)
+    return await controller.get_runbook(runbook_id)
 
 
 @router.delete("/demo/{runbook_id}")
@@ -302,7 +299,7 @@ async def delete_runbook_demo(
 ):
     """Delete a runbook for demo tenant (soft delete)"""
     controller = RunbookController(db, tenant_id=1)  # Demo tenant
-    return controller.delete_runbook(runbook_id)
+    return await controller.delete_runbook(runbook_id)
 
 
 @router.post("/demo/{runbook_id}/approve", response_model=RunbookResponse)
@@ -327,7 +324,7 @@ async def reindex_runbook_demo(
 
 
 # Authenticated endpoints
-@router.get("/", response_model=List[RunbookResponse])
+@router.get("/", response_class=ORJSONResponse, responses={200: {"model": List[RunbookResponse]}})
 async def list_runbooks(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
@@ -336,10 +333,10 @@ async def list_runbooks(
 ):
     """List runbooks for the current tenant"""
     controller = RunbookController(db, current_user.tenant_id)
-    return controller.list_runbooks(skip, limit)
+    return await controller.list_runbooks(skip, limit)
 
 
-@router.get("/{runbook_id}", response_model=RunbookResponse)
+@router.get("/{runbook_id}", response_class=Response, responses={200: {"model": RunbookResponse}})
 async def get_runbook(
     runbook_id: int,
     db: Session = Depends(get_db),
@@ -347,10 +344,10 @@ async def get_runbook(
 ):
     """Get a specific runbook by ID"""
     controller = RunbookController(db, current_user.tenant_id)
-    return controller.get_runbook(runbook_id)
+    return await controller.get_runbook(runbook_id)
 
 
-@router.put("/{runbook_id}", response_model=RunbookResponse)
+@router.put("/{runbook_id}", response_class=Response, responses={200: {"model": RunbookResponse}})
 async def update_runbook(
     runbook_id: int,
     runbook_update: RunbookUpdate,
@@ -359,7 +356,7 @@ async def update_runbook(
 ):
     """Update a runbook"""
     controller = RunbookController(db, current_user.tenant_id)
-    return controller.update_runbook(runbook_id, runbook_update)
+    return await controller.update_runbook(runbook_id, runbook_update)
 
 
 @router.delete("/{runbook_id}")
@@ -370,4 +367,4 @@ async def delete_runbook(
 ):
     """Delete a runbook (soft delete)"""
     controller = RunbookController(db, current_user.tenant_id)
-    return controller.delete_runbook(runbook_id)
\ No newline at end of file
+    return await controller.delete_runbook(runbook_id)
\ No newline at end of file
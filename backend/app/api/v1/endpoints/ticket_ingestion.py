@@ -2,9 +2,11 @@
 Ticket ingestion endpoints - Webhook receiver
 POC version - simplified
 """
-from fastapi import APIRouter, Depends, Request, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import Dict, Any, List
+from app.core.config import settings
 from app.core.database import get_db
 from app.controllers.ticket_controller import TicketController
 
@@ -27,17 +29,45 @@ async def receive_webhook(
     return await controller.receive_webhook(source, payload)
 
 
+@router.post("/webhook/{source}/batch")
+async def receive_webhook_batch(
+    source: str,
+    payloads: List[Dict[str, Any]],
+    db: Session = Depends(get_db)
+):
+    """
+    Receive a batch of webhooks from one monitoring tool in a single request
+    
+    Tickets are inserted with one multi-row INSERT; the response lists them in
+    payload order. At most WEBHOOK_BATCH_MAX_SIZE payloads are accepted.
+    """
+    if len(payloads) > settings.WEBHOOK_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: at most {settings.WEBHOOK_BATCH_MAX_SIZE} payloads per request"
+        )
+    controller = TicketController(db, tenant_id=1)  # Demo tenant
+    return await controller.receive_webhook_batch(source, payloads)
+
+
 @router.post("/demo/ticket")
 async def create_demo_ticket(
     ticket_data: Dict[str, Any],
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
-    """Create a demo ticket for testing"""
+    """
+    Create a demo ticket for testing
+    
+    Returns as soon as the ticket is stored, with its stored status ("open")
+    and classification, confidence and reasoning set to null; analysis and
+    auto-execution continue in the background.
+    """
     controller = TicketController(db, tenant_id=1)  # Demo tenant
-    return await controller.create_demo_ticket(ticket_data)
+    return await controller.create_demo_ticket(ticket_data, background_tasks=background_tasks)
 
 
-@router.get("/demo/tickets")
+@router.get("/demo/tickets", response_class=ORJSONResponse)
 async def list_tickets(
     db: Session = Depends(get_db),
     status: str = None,
@@ -46,13 +76,7 @@ async def list_tickets(
     """List tickets (demo)"""
     try:
         controller = TicketController(db, tenant_id=1)  # Demo tenant
-        result = controller.list_tickets(status, limit)
-        # Ensure result is a dict with 'tickets' key
-        if not isinstance(result, dict):
-            result = {"tickets": []}
-        if "tickets" not in result:
-            result = {"tickets": result if isinstance(result, list) else []}
-        return result
+        return await controller.list_tickets(status, limit)
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
@@ -61,7 +85,7 @@ async def list_tickets(
         logger = get_logger(__name__)
         logger.exception(f"Error in list_tickets: {e}", exc_info=True)
         # Return empty result instead of crashing
-        return {"tickets": []}
+        return ORJSONResponse({"tickets": []})
 
 
 @router.delete("/demo/tickets/cleanup-demo")
@@ -70,18 +94,19 @@ async def cleanup_demo_tickets(
 ):
     """Delete demo/test tickets (prometheus and custom sources)"""
     controller = TicketController(db, tenant_id=1)  # Demo tenant
-    return controller.cleanup_demo_tickets(["prometheus", "custom"])
+    return await controller.cleanup_demo_tickets(["prometheus", "custom"])
 
 
-@router.get("/demo/tickets/{ticket_id}")
+@router.get("/demo/tickets/{ticket_id}", response_class=ORJSONResponse)
 async def get_ticket(
     ticket_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Get ticket details including matched runbooks"""
     try:
         controller = TicketController(db, tenant_id=1)  # Demo tenant
-        return await controller.get_ticket(ticket_id)
+        return await controller.get_ticket(ticket_id, background_tasks=background_tasks)
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
@@ -93,6 +118,16 @@ async def get_ticket(
         raise HTTPException(status_code=500, detail=f"Failed to get ticket: {str(e)}")
 
 
+@router.post("/demo/tickets/{ticket_id}/rematch")
+async def rematch_ticket(
+    ticket_id: int,
+    db: Session = Depends(get_db)
+):
+    """Re-run runbook matching for a ticket instead of using the stored matches"""
+    controller = TicketController(db, tenant_id=1)  # Demo tenant
+    return await controller.rematch_ticket(ticket_id)
+
+
 @router.post("/demo/tickets/{ticket_id}/execute")
 async def execute_ticket_runbook(
     ticket_id: int,
@@ -2,6 +2,7 @@
 Ticket analysis endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -11,21 +12,24 @@ from app.services.auth import get_current_user
 from app.schemas.ticket import (
     TicketAnalysisRequest, 
     TicketAnalysisResponse, 
-    RunbookMatch,
     RunbookUsageRequest,
     RunbookFeedbackRequest
 )
 from app.services.runbook_search import RunbookSearchService
+from app.services.ticket.analysis_decision import decide
+from app.services.ticket.analysis_cache import analysis_cache
 from app.services.config_service import ConfigService
 from app.models.runbook_usage import RunbookUsage
 from app.models.runbook import Runbook
 from app.core.logging import get_logger
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 logger = get_logger(__name__)
 
 
-@router.post("/analyze", response_model=TicketAnalysisResponse)
+# TicketAnalysisResponse is kept for the OpenAPI schema only; the analyze
+# endpoints return plain dicts straight to orjson without Pydantic re-serialization.
+@router.post("/analyze", responses={200: {"model": TicketAnalysisResponse}})
 async def analyze_ticket(
     request: TicketAnalysisRequest,
     db: Session = Depends(get_db),
@@ -43,70 +47,43 @@ async def analyze_ticket(
         # Get confidence threshold from config
         threshold = ConfigService.get_confidence_threshold(db, current_user.tenant_id)
         
-        # Search for similar runbooks
-        search_service = RunbookSearchService()
-        matched_runbooks = await search_service.search_similar_runbooks(
-            issue_description=request.issue_description,
-            tenant_id=current_user.tenant_id,
-            db=db,
-            top_k=5,
-            min_confidence=0.5  # Lower threshold for showing all candidates
-        )
+        # Search for similar runbooks (reuse recent results for identical issues)
+        matched_runbooks = analysis_cache.get(current_user.tenant_id, request.issue_description)
+        if matched_runbooks is None:
+            cache_version = analysis_cache.version(current_user.tenant_id)
+            search_service = RunbookSearchService()
+            matched_runbooks = await search_service.search_similar_runbooks(
+                issue_description=request.issue_description,
+                tenant_id=current_user.tenant_id,
+                db=db,
+                top_k=5,
+                min_confidence=0.5  # Lower threshold for showing all candidates
+            )
+            if matched_runbooks:
+                analysis_cache.set(current_user.tenant_id, request.issue_description, matched_runbooks, cache_version)
         
         # Apply decision logic
-        if not matched_runbooks:
-            # No runbooks found
-            recommendation = "generate_new"
-            confidence = 0.9
-            reasoning = "No similar runbooks found in knowledge base. Suggest generating new runbook."
-            suggested_actions = [
-                "Generate new runbook for this issue",
-                "Review existing knowledge base for partial solutions",
-                "Consider escalating if issue is critical"
-            ]
-        else:
-            # Check if top match exceeds threshold
-            top_match = matched_runbooks[0]
-            
-            if top_match['confidence_score'] >= threshold:
-                # High confidence match
-                recommendation = "existing_runbook"
-                confidence = top_match['confidence_score']
-                reasoning = f"Found {len(matched_runbooks)} similar runbook(s). Top match: {top_match['reasoning']}"
-                suggested_actions = [
-                    f"Use runbook: {top_match['title']}",
-                    f"Confidence: {confidence:.1%}",
-                    "Review steps and execute"
-                ]
-                
-                if len(matched_runbooks) > 1:
-                    suggested_actions.append(f"Also consider {len(matched_runbooks) - 1} alternative runbook(s)")
-            else:
-                # Low confidence - suggest generating new
-                recommendation = "generate_new"
-                confidence = 0.7
-                reasoning = f"Found {len(matched_runbooks)} partially similar runbook(s) but confidence ({top_match['confidence_score']:.1%}) below threshold ({threshold:.1%})"
-                suggested_actions = [
-                    f"Top match only {top_match['confidence_score']:.1%} similar: {top_match['title']}",
-                    "Consider generating a more specific runbook",
-                    "Review suggested runbooks for ideas"
-                ]
-        
-        return TicketAnalysisResponse(
-            recommendation=recommendation,
-            confidence=confidence,
-            reasoning=reasoning,
-            matched_runbooks=[RunbookMatch(**rb) for rb in matched_runbooks],
-            suggested_actions=suggested_actions,
-            threshold_used=threshold
+        recommendation, confidence, reasoning, suggested_actions = decide(
+            matched_runbooks, threshold
         )
         
+        # Search results are built by RunbookSearchService in the RunbookMatch
+        # shape, so they are passed through without re-validation.
+        return ORJSONResponse({
+            "recommendation": recommendation,
+            "confidence": confidence,
+            "reasoning": reasoning,
+            "matched_runbooks": matched_runbooks,
+            "suggested_actions": suggested_actions,
+            "threshold_used": threshold
+        })
+        
     except Exception as e:
         logger.error(f"Error analyzing ticket: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to analyze ticket: {str(e)}")
 
 
-@router.post("/demo/analyze", response_model=TicketAnalysisResponse)
+@router.post("/demo/analyze", responses={200: {"model": TicketAnalysisResponse}})
 async def analyze_ticket_demo(
     request: TicketAnalysisRequest,
     db: Session = Depends(get_db)
@@ -119,60 +96,37 @@ async def analyze_ticket_demo(
         # Get confidence threshold from config
         threshold = ConfigService.get_confidence_threshold(db, demo_tenant_id)
         
-        # Search for similar runbooks
-        search_service = RunbookSearchService()
-        matched_runbooks = await search_service.search_similar_runbooks(
-            issue_description=request.issue_description,
-            tenant_id=demo_tenant_id,
-            db=db,
-            top_k=5,
-            min_confidence=0.5
-        )
-        
-        # Apply decision logic (same as authenticated version)
-        if not matched_runbooks:
-            recommendation = "generate_new"
-            confidence = 0.9
-            reasoning = "No similar runbooks found in knowledge base. Suggest generating new runbook."
-            suggested_actions = [
-                "Generate new runbook for this issue",
-                "Review existing knowledge base for partial solutions",
-                "Consider escalating if issue is critical"
-            ]
-        else:
-            top_match = matched_runbooks[0]
-            
-            if top_match['confidence_score'] >= threshold:
-                recommendation = "existing_runbook"
-                confidence = top_match['confidence_score']
-                reasoning = f"Found {len(matched_runbooks)} similar runbook(s). Top match: {top_match['reasoning']}"
-                suggested_actions = [
-                    f"Use runbook: {top_match['title']}",
-                    f"Confidence: {confidence:.1%}",
-                    "Review steps and execute"
-                ]
-                
-                if len(matched_runbooks) > 1:
-                    suggested_actions.append(f"Also consider {len(matched_runbooks) - 1} alternative runbook(s)")
-            else:
-                recommendation = "generate_new"
-                confidence = 0.7
-                reasoning = f"Found {len(matched_runbooks)} partially similar runbook(s) but confidence ({top_match['confidence_score']:.1%}) below threshold ({threshold:.1%})"
-                suggested_actions = [
-                    f"Top match only {top_match['confidence_score']:.1%} similar: {top_match['title']}",
-                    "Consider generating a more specific runbook",
-                    "Review suggested runbooks for ideas"
-                ]
+        # Search for similar runbooks (reuse recent results for identical issues)
+        matched_runbooks = analysis_cache.get(demo_tenant_id, request.issue_description)
+        if matched_runbooks is None:
+            cache_version = analysis_cache.version(demo_tenant_id)
+            search_service = RunbookSearchService()
+            matched_runbooks = await search_service.search_similar_runbooks(
+                issue_description=request.issue_description,
+                tenant_id=demo_tenant_id,
+                db=db,
+                top_k=5,
+                min_confidence=0.5
+            )
+            if matched_runbooks:
+                analysis_cache.set(demo_tenant_id, request.issue_description, matched_runbooks, cache_version)
         
-        return TicketAnalysisResponse(
-            recommendation=recommendation,
-            confidence=confidence,
-            reasoning=reasoning,
-            matched_runbooks=[RunbookMatch(**rb) for rb in matched_runbooks],
-            suggested_actions=suggested_actions,
-            threshold_used=threshold
+        # Apply decision logic
+        recommendation, confidence, reasoning, suggested_actions = decide(
+            matched_runbooks, threshold
         )
         
+        # Search results are built by RunbookSearchService in the RunbookMatch
+        # shape, so they are passed through without re-validation.
+        return ORJSONResponse({
+            "recommendation": recommendation,
+            "confidence": confidence,
+            "reasoning": reasoning,
+            "matched_runbooks": matched_runbooks,
+            "suggested_actions": suggested_actions,
+            "threshold_used": threshold
+        })
+        
     except Exception as e:
         logger.error(f"Error analyzing ticket (demo): {e}")
         raise HTTPException(status_code=500, detail=f"Failed to analyze ticket: {str(e)}")
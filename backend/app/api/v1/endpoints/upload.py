@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from typing import Optional
 
+from app.core.config import ensure_upload_dir
 from app.core.database import get_db
 from app.models.user import User
 from app.services.auth import get_current_user
@@ -24,6 +25,7 @@ async def upload_file(
 ):
     """Upload and ingest a file"""
     try:
+        ensure_upload_dir()
         ingestion_service = IngestionService()
         
         # Validate file type
@@ -63,6 +65,7 @@ async def upload_batch(
 ):
     """Upload multiple files in batch"""
     try:
+        ensure_upload_dir()
         ingestion_service = IngestionService()
         results = []
         
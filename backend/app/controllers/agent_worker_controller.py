@@ -108,20 +108,24 @@ class AgentWorkerController(BaseController):
             if not session_exists:
                 raise self.not_found("Execution session", session_id)
             
+            acknowledged_at = datetime.now(timezone.utc)
             assignment.worker_id = worker_id
             assignment.status = "acknowledged"
-            assignment.acknowledged_at = datetime.now(timezone.utc)
-            db.commit()
-            db.refresh(assignment)
-            
-            agent_worker_manager.heartbeat(worker_id)
-            metrics.record_assignment(assignment.status)
+            assignment.acknowledged_at = acknowledged_at
             
-            return {
+            # Build the response from in-memory state before commit expires the
+            # instance, so no refresh SELECT is needed afterwards.
+            result = {
                 "assignment_id": assignment.id,
                 "status": assignment.status,
-                "acknowledged_at": assignment.acknowledged_at.isoformat()
+                "acknowledged_at": acknowledged_at.isoformat()
             }
+            db.commit()
+            
+            agent_worker_manager.heartbeat(worker_id)
+            metrics.record_assignment(result["status"])
+            
+            return result
         except HTTPException:
             raise
         except Exception as e:
@@ -3,6 +3,7 @@ Base controller with common utilities
 """
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.core.logging import get_logger
 
@@ -51,12 +52,8 @@ class BaseController:
     @staticmethod
     def validate_tenant_access(db: Session, tenant_id: int, resource_id: int, model_class) -> bool:
         """Validate that resource belongs to tenant"""
-        resource = db.query(model_class).filter(
+        stmt = select(1).where(
             model_class.id == resource_id,
             model_class.tenant_id == tenant_id
-        ).first()
-        return resource is not None
-
-
-
-
+        ).limit(1)
+        return db.execute(stmt).scalar() is not None
@@ -1,24 +1,36 @@
 """
 Controller for connector endpoints - handles request/response logic
 """
-from typing import Optional, Dict, Any, List
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, field_validator
 
 from app.controllers.base_controller import BaseController
 from app.repositories.credential_repository import CredentialRepository
 from app.repositories.infrastructure_repository import InfrastructureRepository
-from app.services.credential_service import get_credential_service
-from app.services.connector.connector_service import ConnectorService
-from app.models.credential import Credential, InfrastructureConnection
+from app.services.credential_service import CredentialService, get_credential_service
+from app.services.connector.connector_service import ConnectorService, get_connector_service
+from app.models.credential import Credential
 from app.core.logging import get_logger
-import json
+import orjson
 
 logger = get_logger(__name__)
 
 
-class CredentialCreate(BaseModel):
+class _ConnectorRequest(BaseModel):
+    """Base for connector request bodies: unknown keys are dropped and attribute
+    assignment is never re-validated, keeping per-request validation minimal"""
+    
+    class Config:
+        extra = "ignore"
+        validate_assignment = False
+        arbitrary_types_allowed = False
+
+
+class CredentialCreate(_ConnectorRequest):
     name: str
     credential_type: str
     environment: str
@@ -39,7 +51,7 @@ class CredentialCreate(BaseModel):
     region: Optional[str] = None
 
 
-class InfrastructureConnectionCreate(BaseModel):
+class InfrastructureConnectionCreate(_ConnectorRequest):
     name: str
     connection_type: str
     credential_id: Optional[int] = None
@@ -50,66 +62,182 @@ class InfrastructureConnectionCreate(BaseModel):
     meta_data: Optional[Dict[str, Any]] = None
 
 
-class TestCommandRequest(BaseModel):
+class InfrastructureConnectionUpdate(_ConnectorRequest):
+    """Partial update; only fields present in the request body are written"""
+    name: Optional[str] = None
+    connection_type: Optional[str] = None
+    credential_id: Optional[int] = None
+    target_host: Optional[str] = None
+    target_port: Optional[int] = None
+    target_service: Optional[str] = None
+    environment: Optional[str] = None
+    meta_data: Optional[Dict[str, Any]] = None
+    
+    @field_validator("name", "connection_type", "credential_id", "environment")
+    @classmethod
+    def _reject_null(cls, value: Any) -> Any:
+        # Omitting these is fine; an explicit null would hit a NOT NULL column
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+
+class TestCommandRequest(_ConnectorRequest):
     vm_resource_id: str
     command: str
     shell: Optional[str] = None
 
 
+# Connector catalogs are static: each is built and orjson-encoded once, on first
+# use, and the list endpoints return the cached bytes thereafter.
+@lru_cache(maxsize=1)
+def _monitoring_catalog_json() -> bytes:
+    return orjson.dumps({
+        "available_connectors": [
+            {
+                "type": "datadog",
+                "name": "Datadog",
+                "status": "implemented",
+                "description": "Cloud monitoring and alerting platform"
+            },
+            {
+                "type": "prometheus",
+                "name": "Prometheus",
+                "status": "webhook_supported",
+                "description": "Open-source monitoring and alerting toolkit"
+            },
+            {
+                "type": "zabbix",
+                "name": "Zabbix",
+                "status": "planned",
+                "description": "Enterprise monitoring solution"
+            },
+            {
+                "type": "solarwinds",
+                "name": "SolarWinds",
+                "status": "planned",
+                "description": "Infrastructure monitoring platform"
+            },
+            {
+                "type": "manageengine",
+                "name": "ManageEngine",
+                "status": "planned",
+                "description": "IT management suite"
+            }
+        ]
+    })
+
+
+@lru_cache(maxsize=1)
+def _ticketing_catalog_json() -> bytes:
+    return orjson.dumps({
+        "available_connectors": [
+            {
+                "type": "servicenow",
+                "name": "ServiceNow",
+                "status": "implemented",
+                "description": "IT service management platform"
+            },
+            {
+                "type": "zendesk",
+                "name": "Zendesk",
+                "status": "planned",
+                "description": "Customer service platform"
+            },
+            {
+                "type": "manageengine",
+                "name": "ManageEngine ServiceDesk",
+                "status": "planned",
+                "description": "IT service desk solution"
+            },
+            {
+                "type": "bmcremedy",
+                "name": "BMC Remedy",
+                "status": "planned",
+                "description": "ITSM platform"
+            }
+        ]
+    })
+
+
+# Cloud credential types: (required fields, field holding the secret to encrypt,
+# fields copied into metadata, error when a required field is missing)
+_CLOUD_CREDENTIAL_SCHEMAS = {
+    "azure": (
+        ("tenant_id", "client_id", "client_secret"),
+        "client_secret",
+        ("tenant_id", "client_id", "subscription_id"),
+        "Azure credentials require tenant_id, client_id, and client_secret"
+    ),
+    "gcp": (
+        ("service_account_key",),
+        "service_account_key",
+        ("project_id",),
+        "GCP credentials require service_account_key"
+    ),
+    "aws": (
+        ("access_key_id", "secret_access_key"),
+        "secret_access_key",
+        ("access_key_id", "region"),
+        "AWS credentials require access_key_id and secret_access_key"
+    ),
+}
+
+
+def _resolve_credential_secret(
+    credential: CredentialCreate
+) -> Tuple[Optional[str], Dict[str, Any], Optional[str]]:
+    """
+    Work out which value to encrypt and the metadata to store for a credential.
+    
+    Returns (value_to_encrypt, metadata, error); error is a client-facing message
+    when the payload is incomplete, so the caller raises a single 400 at the boundary.
+    """
+    metadata = {
+        "username": credential.username,
+        "host": credential.host,
+        "port": credential.port,
+        "database_name": credential.database_name
+    }
+    
+    schema = _CLOUD_CREDENTIAL_SCHEMAS.get(credential.credential_type)
+    if schema:
+        required_fields, secret_field, metadata_fields, error_message = schema
+        if any(not getattr(credential, field) for field in required_fields):
+            return None, metadata, error_message
+        value_to_encrypt = getattr(credential, secret_field)
+        metadata.update({field: getattr(credential, field) for field in metadata_fields})
+    else:
+        value_to_encrypt = credential.password or credential.api_key
+    
+    if not value_to_encrypt:
+        return None, metadata, "Password, API key, or cloud credentials required"
+    return value_to_encrypt, metadata, None
+
+
 class ConnectorController(BaseController):
     """Controller for connector operations"""
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        connector_service: Optional[ConnectorService] = None,
+        credential_service: Optional[CredentialService] = None
+    ):
         self.db = db
         self.tenant_id = 1  # Demo tenant
         self.credential_repo = CredentialRepository(db)
         self.infrastructure_repo = InfrastructureRepository(db)
-        self.connector_service = ConnectorService()
-        self.credential_service = get_credential_service()
+        # Services are stateless; reuse the process-wide instances
+        self.connector_service = connector_service or get_connector_service()
+        self.credential_service = credential_service or get_credential_service()
     
     def create_credential(self, credential: CredentialCreate) -> Dict[str, Any]:
         """Create a new credential"""
         try:
-            # Determine which value to encrypt based on credential type
-            value_to_encrypt = None
-            metadata = {
-                "username": credential.username,
-                "host": credential.host,
-                "port": credential.port,
-                "database_name": credential.database_name
-            }
-            
-            if credential.credential_type == "azure":
-                if not credential.tenant_id or not credential.client_id or not credential.client_secret:
-                    raise self.bad_request("Azure credentials require tenant_id, client_id, and client_secret")
-                value_to_encrypt = credential.client_secret
-                metadata.update({
-                    "tenant_id": credential.tenant_id,
-                    "client_id": credential.client_id,
-                    "subscription_id": credential.subscription_id
-                })
-            elif credential.credential_type == "gcp":
-                if not credential.service_account_key:
-                    raise self.bad_request("GCP credentials require service_account_key")
-                value_to_encrypt = credential.service_account_key
-                metadata.update({
-                    "project_id": credential.project_id
-                })
-            elif credential.credential_type == "aws":
-                if not credential.access_key_id or not credential.secret_access_key:
-                    raise self.bad_request("AWS credentials require access_key_id and secret_access_key")
-                value_to_encrypt = credential.secret_access_key
-                metadata.update({
-                    "access_key_id": credential.access_key_id,
-                    "region": credential.region
-                })
-            elif credential.password:
-                value_to_encrypt = credential.password
-            elif credential.api_key:
-                value_to_encrypt = credential.api_key
-            
-            if not value_to_encrypt:
-                raise self.bad_request("Password, API key, or cloud credentials required")
+            value_to_encrypt, metadata, error = _resolve_credential_secret(credential)
+            if error:
+                raise self.bad_request(error)
             
             db_credential = self.credential_service.save_credential(
                 db=self.db,
@@ -133,26 +261,14 @@ class ConnectorController(BaseController):
             logger.error(f"Error creating credential: {e}")
             raise self.handle_error(e, "Failed to create credential")
     
-    def list_credentials(self, environment: Optional[str] = None) -> Dict[str, Any]:
+    def list_credentials(self, environment: Optional[str] = None) -> ORJSONResponse:
         """List all credentials"""
         try:
-            credentials = self.credential_repo.get_by_tenant(self.tenant_id, environment)
-            
-            return {
-                "credentials": [
-                    {
-                        "id": c.id,
-                        "name": c.name,
-                        "type": c.credential_type,
-                        "environment": c.environment,
-                        "host": c.host,
-                        "port": c.port,
-                        "database_name": c.database_name,
-                        "created_at": c.created_at.isoformat() if c.created_at else None
-                    }
-                    for c in credentials
-                ]
-            }
+            # Rows come back already shaped for the response; orjson encodes
+            # created_at natively
+            return ORJSONResponse({
+                "credentials": self.credential_repo.list_projection(self.tenant_id, environment)
+            })
         except Exception as e:
             logger.error(f"Error listing credentials: {e}")
             raise self.handle_error(e, "Failed to list credentials")
@@ -160,7 +276,7 @@ class ConnectorController(BaseController):
     def create_infrastructure_connection(self, connection: InfrastructureConnectionCreate) -> Dict[str, Any]:
         """Create a new infrastructure connection"""
         try:
-            infra_conn = InfrastructureConnection(
+            row = self.infrastructure_repo.insert_returning(
                 tenant_id=self.tenant_id,
                 credential_id=connection.credential_id,
                 name=connection.name,
@@ -169,20 +285,17 @@ class ConnectorController(BaseController):
                 target_port=connection.target_port,
                 target_service=connection.target_service,
                 environment=connection.environment,
-                meta_data=json.dumps(connection.meta_data) if connection.meta_data else None,
+                meta_data=orjson.dumps(connection.meta_data).decode() if connection.meta_data else None,
                 is_active=True
             )
-            
-            self.db.add(infra_conn)
             self.db.commit()
-            self.db.refresh(infra_conn)
             
             return {
-                "id": infra_conn.id,
-                "name": infra_conn.name,
-                "type": infra_conn.connection_type,
-                "target_host": infra_conn.target_host,
-                "target_port": infra_conn.target_port,
+                "id": row.id,
+                "name": connection.name,
+                "type": connection.connection_type,
+                "target_host": connection.target_host,
+                "target_port": connection.target_port,
                 "message": "Infrastructure connection created successfully"
             }
         except Exception as e:
@@ -193,30 +306,16 @@ class ConnectorController(BaseController):
         self,
         environment: Optional[str] = None,
         connection_type: Optional[str] = None
-    ) -> Dict[str, Any]:
+    ) -> ORJSONResponse:
         """List all infrastructure connections"""
         try:
-            connections = self.infrastructure_repo.get_by_tenant(self.tenant_id, environment)
-            
-            # Filter by connection_type if provided
-            if connection_type:
-                connections = [c for c in connections if c.connection_type == connection_type]
-            
-            return {
-                "connections": [
-                    {
-                        "id": c.id,
-                        "name": c.name,
-                        "type": c.connection_type,
-                        "target_host": c.target_host,
-                        "target_port": c.target_port,
-                        "environment": c.environment,
-                        "credential_id": c.credential_id,
-                        "created_at": c.created_at.isoformat() if c.created_at else None
-                    }
-                    for c in connections
-                ]
-            }
+            # Rows come back already shaped for the response; orjson encodes
+            # created_at natively
+            return ORJSONResponse({
+                "connections": self.infrastructure_repo.list_projection(
+                    self.tenant_id, environment, connection_type=connection_type
+                )
+            })
         except Exception as e:
             logger.error(f"Error listing infrastructure connections: {e}")
             raise self.handle_error(e, "Failed to list infrastructure connections")
@@ -224,31 +323,26 @@ class ConnectorController(BaseController):
     def update_infrastructure_connection(
         self,
         connection_id: int,
-        connection: InfrastructureConnectionCreate
+        connection: InfrastructureConnectionUpdate
     ) -> Dict[str, Any]:
         """Update an infrastructure connection"""
         try:
-            infra_conn = self.infrastructure_repo.get_by_id_and_tenant(connection_id, self.tenant_id)
-            if not infra_conn:
-                raise self.not_found("Infrastructure connection", connection_id)
-            
-            infra_conn.name = connection.name
-            infra_conn.connection_type = connection.connection_type
-            infra_conn.credential_id = connection.credential_id
-            infra_conn.target_host = connection.target_host
-            infra_conn.target_port = connection.target_port
-            infra_conn.target_service = connection.target_service
-            infra_conn.environment = connection.environment
-            if connection.meta_data is not None:
-                infra_conn.meta_data = json.dumps(connection.meta_data)
+            changes = connection.model_dump(exclude_unset=True)
+            if "meta_data" in changes:
+                # A null meta_data leaves the stored value untouched
+                meta_data = changes.pop("meta_data")
+                if meta_data is not None:
+                    changes["meta_data"] = orjson.dumps(meta_data).decode()
             
+            row = self.infrastructure_repo.update_fields(connection_id, self.tenant_id, changes)
+            if row is None:
+                raise self.not_found("Infrastructure connection", connection_id)
             self.db.commit()
-            self.db.refresh(infra_conn)
             
             return {
-                "id": infra_conn.id,
-                "name": infra_conn.name,
-                "type": infra_conn.connection_type,
+                "id": row.id,
+                "name": row.name,
+                "type": row.connection_type,
                 "message": "Infrastructure connection updated successfully"
             }
         except HTTPException:
@@ -260,11 +354,8 @@ class ConnectorController(BaseController):
     def delete_infrastructure_connection(self, connection_id: int) -> Dict[str, Any]:
         """Delete an infrastructure connection"""
         try:
-            infra_conn = self.infrastructure_repo.get_by_id_and_tenant(connection_id, self.tenant_id)
-            if not infra_conn:
+            if not self.infrastructure_repo.soft_delete(connection_id, self.tenant_id):
                 raise self.not_found("Infrastructure connection", connection_id)
-            
-            infra_conn.is_active = False
             self.db.commit()
             
             return {
@@ -319,71 +410,10 @@ class ConnectorController(BaseController):
             logger.error(f"Error executing test command: {e}")
             raise self.handle_error(e, "Failed to execute command")
     
-    def list_monitoring_connectors(self) -> Dict[str, Any]:
+    def list_monitoring_connectors(self) -> Response:
         """List available monitoring tool connectors"""
-        return {
-            "available_connectors": [
-                {
-                    "type": "datadog",
-                    "name": "Datadog",
-                    "status": "implemented",
-                    "description": "Cloud monitoring and alerting platform"
-                },
-                {
-                    "type": "prometheus",
-                    "name": "Prometheus",
-                    "status": "webhook_supported",
-                    "description": "Open-source monitoring and alerting toolkit"
-                },
-                {
-                    "type": "zabbix",
-                    "name": "Zabbix",
-                    "status": "planned",
-                    "description": "Enterprise monitoring solution"
-                },
-                {
-                    "type": "solarwinds",
-                    "name": "SolarWinds",
-                    "status": "planned",
-                    "description": "Infrastructure monitoring platform"
-                },
-                {
-                    "type": "manageengine",
-                    "name": "ManageEngine",
-                    "status": "planned",
-                    "description": "IT management suite"
-                }
-            ]
-        }
+        return Response(content=_monitoring_catalog_json(), media_type="application/json")
     
-    def list_ticketing_connectors(self) -> Dict[str, Any]:
+    def list_ticketing_connectors(self) -> Response:
         """List available ticketing system connectors"""
-        return {
-            "available_connectors": [
-                {
-                    "type": "servicenow",
-                    "name": "ServiceNow",
-                    "status": "implemented",
-                    "description": "IT service management platform"
-                },
-                {
-                    "type": "zendesk",
-                    "name": "Zendesk",
-                    "status": "planned",
-                    "description": "Customer service platform"
-                },
-                {
-                    "type": "manageengine",
-                    "name": "ManageEngine ServiceDesk",
-                    "status": "planned",
-                    "description": "IT service desk solution"
-                },
-                {
-                    "type": "bmcremedy",
-                    "name": "BMC Remedy",
-                    "status": "planned",
-                    "description": "ITSM platform"
-                }
-            ]
-        }
-
+        return Response(content=_ticketing_catalog_json(), media_type="application/json")
@@ -1,10 +1,12 @@
 """
 Controller for execution endpoints - handles request/response logic
 """
+import asyncio
+import time
 from typing import Dict, Any, List, Optional, Literal
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session
-from fastapi import HTTPException
+from fastapi import BackgroundTasks, HTTPException
 
 from app.controllers.base_controller import BaseController
 from app.repositories.execution_repository import ExecutionRepository
@@ -15,10 +17,42 @@ from app.services.execution_orchestrator import execution_orchestrator
 from app.services.idempotency import idempotency_manager
 from app.services.execution import ExecutionEngine
 from app.services.ticket_status_service import get_ticket_status_service
+from app.services.circuit_breaker import CircuitBreaker, CircuitBreakerOpen
+from app.core.config import settings
+from app.core.database import SessionLocal
 from app.core.logging import get_logger
+from app.core.metrics import observe_execution_start_wait
 
 logger = get_logger(__name__)
 
+# Caps concurrent auto-started executions per worker so request bursts cannot
+# exhaust the DB pool; time spent waiting for a slot is exported as a metric
+_execution_start_semaphore = asyncio.Semaphore(max(1, settings.EXEC_MAX_CONCURRENCY))
+
+# Fails fast with 503 after repeated listing query failures (e.g. pool exhaustion)
+_listing_breaker = CircuitBreaker("execution_listing", fail_max=5, reset_timeout=30)
+
+
+async def _start_execution_capped(engine: ExecutionEngine, db: Session, session_id: int) -> ExecutionSession:
+    """Run engine.start_execution under the per-worker concurrency cap"""
+    wait_started = time.perf_counter()
+    async with _execution_start_semaphore:
+        observe_execution_start_wait(time.perf_counter() - wait_started)
+        return await engine.start_execution(db, session_id)
+
+
+async def _start_execution_in_background(session_id: int) -> None:
+    """Auto-start a session after the response is sent, using its own DB session"""
+    db = SessionLocal()
+    try:
+        session = await _start_execution_capped(ExecutionEngine(), db, session_id)
+        logger.info(f"Execution started for session {session_id}, status: {session.status}")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to auto-start execution for session {session_id}: {e}", exc_info=True)
+    finally:
+        db.close()
+
 
 class ExecutionController(BaseController):
     """Controller for execution operations"""
@@ -37,17 +71,20 @@ class ExecutionController(BaseController):
         ticket_id: Optional[int] = None,
         user_id: Optional[int] = None,
         metadata: Optional[Dict[str, Any]] = None,
-        idempotency_key: Optional[str] = None
+        idempotency_key: Optional[str] = None,
+        background_tasks: Optional[BackgroundTasks] = None
     ) -> Dict[str, Any]:
-        """Create a new execution session for a runbook"""
+        """
+        Create a new execution session for a runbook.
+        
+        When ``background_tasks`` is given, execution is auto-started after the
+        response is sent instead of on the request path.
+        """
         idempotency_key = (idempotency_key or "").strip() or None
         reservation_committed = False
         
         try:
-            runbook = self.db.query(Runbook).filter(Runbook.id == runbook_id).first()
-            if not runbook:
-                raise self.not_found("Runbook", runbook_id)
-            
+            # Retries are answered before touching the runbooks table
             if idempotency_key:
                 existing_id = await idempotency_manager.reserve("session", idempotency_key)
                 if existing_id:
@@ -56,12 +93,20 @@ class ExecutionController(BaseController):
                             status_code=409,
                             detail="Session creation already in progress for provided idempotency key."
                         )
-                    existing_session = self.execution_repo.get_by_id(int(existing_id))
+                    existing_session = await asyncio.to_thread(
+                        self.execution_repo.get_with_runbook, int(existing_id)
+                    )
                     if existing_session:
-                        payload = execution_orchestrator.serialize_session(existing_session)
-                        payload["runbook_title"] = runbook.title
+                        payload = await asyncio.to_thread(execution_orchestrator.serialize_session, existing_session)
+                        existing_runbook = existing_session.runbook
+                        payload["runbook_title"] = existing_runbook.title if existing_runbook else None
                         return payload
             
+            # Primary-key lookup: served from the identity map when already loaded
+            runbook = await asyncio.to_thread(self.db.get, Runbook, runbook_id)
+            if not runbook:
+                raise self.not_found("Runbook", runbook_id)
+            
             session = await execution_orchestrator.enqueue_session(
                 self.db,
                 runbook_id=runbook_id,
@@ -77,24 +122,33 @@ class ExecutionController(BaseController):
             if session.status == "queued":
                 logger.info(f"Session {session.id} is queued. Changing to pending and starting execution for demo...")
                 session.status = "pending"
-                self.db.commit()
-                self.db.refresh(session)
+                await asyncio.to_thread(self._commit_and_refresh, session)
             
-            if session.status == "pending":
+            if session.status == "pending" and background_tasks is not None:
+                logger.info(f"Scheduling auto-start of execution for session {session.id}")
+                background_tasks.add_task(_start_execution_in_background, session.id)
+            elif session.status == "pending":
                 try:
                     logger.info(f"Auto-starting execution for session {session.id}")
-                    session = await self.execution_engine.start_execution(self.db, session.id)
-                    self.db.refresh(session)
+                    session = await _start_execution_capped(self.execution_engine, self.db, session.id)
+                    await asyncio.to_thread(self.db.refresh, session)
                     logger.info(f"Execution started for session {session.id}, status: {session.status}")
                 except Exception as e:
                     logger.error(f"Failed to auto-start execution for session {session.id}: {e}", exc_info=True)
             
-            payload = execution_orchestrator.serialize_session(session)
-            payload["runbook_title"] = runbook.title
-            
+            # Serialization walks steps/assignments (and may lazy-load them), so keep it off the loop
             if idempotency_key:
-                await idempotency_manager.commit("session", idempotency_key, str(session.id))
+                # Independent work: overlap the Redis commit with serialization
+                async with asyncio.TaskGroup() as tg:
+                    tg.create_task(idempotency_manager.commit("session", idempotency_key, str(session.id)))
+                    serialize_task = tg.create_task(
+                        asyncio.to_thread(execution_orchestrator.serialize_session, session)
+                    )
                 reservation_committed = True
+                payload = serialize_task.result()
+            else:
+                payload = await asyncio.to_thread(execution_orchestrator.serialize_session, session)
+            payload["runbook_title"] = runbook.title
             
             return payload
         except HTTPException:
@@ -104,30 +158,19 @@ class ExecutionController(BaseController):
         except Exception as e:
             if idempotency_key and not reservation_committed:
                 await idempotency_manager.release("session", idempotency_key)
-            self.db.rollback()
+            await asyncio.to_thread(self.db.rollback)
             logger.exception("Failed to enqueue execution session: %s", e)
             raise self.handle_error(e, "Failed to create execution session")
     
     def get_execution_session(self, session_id: int) -> Dict[str, Any]:
         """Get execution session details with all steps"""
         try:
-            session = self.execution_repo.get_by_id(session_id)
+            # Runbook, steps and assignments come back in the same round-trip
+            session = self.execution_repo.get_with_runbook(session_id)
             if not session:
                 raise self.not_found("Execution session", session_id)
             
-            # Eagerly load relationships to avoid lazy loading issues
-            try:
-                # Access steps to trigger loading (if not already loaded)
-                _ = session.steps
-            except Exception as e:
-                logger.warning(f"Error loading steps for session {session_id}: {e}")
-                # Continue with empty steps list
-            
-            try:
-                runbook = self.db.query(Runbook).filter(Runbook.id == session.runbook_id).first()
-            except Exception as e:
-                logger.warning(f"Error loading runbook for session {session_id}: {e}")
-                runbook = None
+            runbook = session.runbook
             
             try:
                 payload = execution_orchestrator.serialize_session(session)
@@ -144,13 +187,7 @@ class ExecutionController(BaseController):
                     "error": "Failed to fully serialize session data"
                 }
             
-            if runbook:
-                if runbook.is_active == "archived":
-                    payload["runbook_title"] = f"{runbook.title} (Archived)"
-                else:
-                    payload["runbook_title"] = runbook.title
-            else:
-                payload["runbook_title"] = "Unknown (Runbook Deleted)"
+            payload["runbook_title"] = runbook.display_title if runbook else "Unknown (Runbook Deleted)"
             
             return payload
         except HTTPException:
@@ -168,8 +205,7 @@ class ExecutionController(BaseController):
         """Return recorded execution events for a session"""
         try:
             # Verify session exists (lightweight check)
-            session = self.execution_repo.get_by_id(session_id)
-            if not session:
+            if not self.execution_repo.exists(session_id):
                 raise self.not_found("Execution session", session_id)
             
             # Limit maximum to prevent huge queries
@@ -209,12 +245,13 @@ class ExecutionController(BaseController):
         approved: Optional[bool] = None
     ) -> Dict[str, Any]:
         """Update a specific step's completion status"""
+        now = datetime.now(timezone.utc)
         try:
-            session = self.execution_repo.get_by_id(session_id)
+            session = await asyncio.to_thread(self.execution_repo.get_by_id, session_id)
             if not session:
                 raise self.not_found("Execution session", session_id)
             
-            step = self.execution_repo.get_step(session_id, step_number, step_type)
+            step = await asyncio.to_thread(self.execution_repo.get_step, session_id, step_number, step_type)
             if not step:
                 raise self.not_found("Execution step", step_number)
             
@@ -231,7 +268,7 @@ class ExecutionController(BaseController):
                 step.notes = notes
             
             if completed:
-                step.completed_at = datetime.now(timezone.utc)
+                step.completed_at = now
             else:
                 step.completed_at = None
             
@@ -245,40 +282,50 @@ class ExecutionController(BaseController):
                         user_id=None,
                         approve=True
                     )
-                    self.db.refresh(session)
+                    # approve_step commits and hands back the same identity-mapped
+                    # instance, so no refresh is needed here
                     logger.info(f"Step {step_number} approved and executed. Session status: {session.status}")
                     return {"message": "Step approved and execution triggered", "session": session}
                 else:
                     step.approved = approved
-                    step.approved_at = datetime.now(timezone.utc) if approved else None
+                    step.approved_at = now if approved else None
                     if not approved:
                         session.status = "failed"
                         session.waiting_for_approval = False
-                        session.completed_at = datetime.now(timezone.utc)
+                        session.completed_at = now
             elif step.requires_approval and step.approved is None:
                 session.waiting_for_approval = True
             
             # Update session progress
             if approved is None or not approved or not step.requires_approval:
-                remaining_steps = [s for s in session.steps if not s.completed]
-                if remaining_steps:
-                    session.current_step = remaining_steps[0].step_number
-                else:
-                    session.current_step = session.steps[-1].step_number if session.steps else None
-                session.waiting_for_approval = any(s.requires_approval and s.approved is None for s in session.steps)
-                if session.waiting_for_approval:
-                    session.status = "waiting_approval"
-                elif session.status != "failed":
-                    session.status = "in_progress"
+                await asyncio.to_thread(self._refresh_progress, session)
             
-            self.db.commit()
+            await asyncio.to_thread(self.db.commit)
             return {"message": "Step updated successfully"}
         except HTTPException:
             raise
         except Exception as e:
-            self.db.rollback()
+            await asyncio.to_thread(self.db.rollback)
             raise self.handle_error(e, "Failed to update step")
     
+    def _refresh_progress(self, session: ExecutionSession) -> None:
+        """Recompute current step / approval state from the session's steps"""
+        # Sessions are built with autoflush=False: flush the pending step change
+        # so the aggregate sees it
+        self.db.flush()
+        next_step, pending_approvals, last_step = self.execution_repo.step_progress_summary(session.id)
+        session.current_step = next_step if next_step is not None else last_step
+        session.waiting_for_approval = pending_approvals > 0
+        if session.waiting_for_approval:
+            session.status = "waiting_approval"
+        elif session.status != "failed":
+            session.status = "in_progress"
+    
+    def _commit_and_refresh(self, session: ExecutionSession) -> None:
+        """Commit and reload the session (run via asyncio.to_thread)"""
+        self.db.commit()
+        self.db.refresh(session)
+    
     async def submit_manual_command(
         self,
         session_id: int,
@@ -355,7 +402,7 @@ class ExecutionController(BaseController):
                 reason=reason,
                 user_id=user_id
             )
-            return execution_orchestrator.serialize_session(session)
+            return await asyncio.to_thread(execution_orchestrator.serialize_session, session)
         except ValueError as e:
             raise HTTPException(status_code=404, detail=str(e))
         except Exception as e:
@@ -373,48 +420,48 @@ class ExecutionController(BaseController):
     ) -> Dict[str, Any]:
         """Complete an execution session and record feedback"""
         try:
-            session = self.execution_repo.get_by_id(session_id)
-            if not session:
-                raise self.not_found("Execution session", session_id)
-            
-            # Calculate duration
-            completed_at = datetime.now()
-            duration_minutes = int((completed_at - session.started_at).total_seconds() / 60) if session.started_at else 0
-            
-            # Update session
-            session.status = "completed" if was_successful else "failed"
-            session.completed_at = completed_at
-            session.total_duration_minutes = duration_minutes
-            
-            # Create feedback
-            self.execution_repo.create_feedback(
-                session_id=session_id,
-                was_successful=was_successful,
-                issue_resolved=issue_resolved,
-                rating=rating,
-                feedback_text=feedback_text,
-                suggestions=suggestions
-            )
-            
-            # Create or update runbook usage tracking
-            runbook_usage = RunbookUsage(
-                runbook_id=session.runbook_id,
-                tenant_id=session.tenant_id,
-                user_id=session.user_id,
-                issue_description=session.issue_description,
-                confidence_score=0.0,
-                was_helpful=was_successful,
-                feedback_text=feedback_text,
-                execution_time_minutes=duration_minutes
-            )
-            self.db.add(runbook_usage)
-            self.db.commit()
+            # One explicit transaction: commits on success, rolls back on any exception
+            with self.db.begin():
+                # Status, completion time and duration are applied in one UPDATE;
+                # started_at is timezone-aware, so "now" must be too
+                completed_at = datetime.now(timezone.utc)
+                row = self.execution_repo.transition_status(
+                    session_id,
+                    "completed" if was_successful else "failed",
+                    completed_at,
+                    default_duration=0,
+                    forbidden=()
+                )
+                if not row:
+                    raise self.not_found("Execution session", session_id)
+                
+                # Create feedback
+                self.execution_repo.create_feedback(
+                    session_id=session_id,
+                    was_successful=was_successful,
+                    issue_resolved=issue_resolved,
+                    rating=rating,
+                    feedback_text=feedback_text,
+                    suggestions=suggestions
+                )
+                
+                # Create or update runbook usage tracking
+                runbook_usage = RunbookUsage(
+                    runbook_id=row.runbook_id,
+                    tenant_id=row.tenant_id,
+                    user_id=row.user_id,
+                    issue_description=row.issue_description,
+                    confidence_score=0.0,
+                    was_helpful=was_successful,
+                    feedback_text=feedback_text,
+                    execution_time_minutes=row.total_duration_minutes
+                )
+                self.db.add(runbook_usage)
             
             return {"message": "Execution session completed", "session_id": session_id}
         except HTTPException:
             raise
         except Exception as e:
-            self.db.rollback()
             raise self.handle_error(e, "Failed to complete execution session")
     
     def abandon_execution_session(
@@ -424,24 +471,22 @@ class ExecutionController(BaseController):
     ) -> Dict[str, Any]:
         """Abandon a stuck execution session"""
         try:
-            session = self.execution_repo.get_by_id(session_id)
-            if not session:
-                raise self.not_found("Execution session", session_id)
-            
-            if session.status in ["completed", "failed", "abandoned"]:
-                raise self.bad_request(f"Session is already {session.status} and cannot be abandoned")
-            
-            # Mark as abandoned
-            session.status = "abandoned"
-            session.completed_at = datetime.now(timezone.utc)
-            if session.started_at:
-                duration_minutes = int((session.completed_at - session.started_at).total_seconds() / 60)
-                session.total_duration_minutes = duration_minutes
+            # Terminal sessions are excluded by the UPDATE itself
+            row = self.execution_repo.transition_status(
+                session_id,
+                "abandoned",
+                datetime.now(timezone.utc)
+            )
+            if not row:
+                current_status = self.execution_repo.get_status(session_id)
+                if current_status is None:
+                    raise self.not_found("Execution session", session_id)
+                raise self.bad_request(f"Session is already {current_status} and cannot be abandoned")
             
             # Update ticket status if linked
-            if session.ticket_id:
+            if row.ticket_id:
                 self.ticket_status_service.update_ticket_on_execution_complete(
-                    self.db, session.ticket_id, "abandoned", issue_resolved=False
+                    self.db, row.ticket_id, "abandoned", issue_resolved=False
                 )
             
             self.db.commit()
@@ -457,12 +502,12 @@ class ExecutionController(BaseController):
     
     def get_runbook_execution_history(self, runbook_id: int) -> Dict[str, Any]:
         """Get all execution sessions for a specific runbook"""
-        sessions = self.execution_repo.get_by_runbook(runbook_id)
+        rows = self.execution_repo.get_by_runbook_with_step_counts(runbook_id)
         
         result: List[Dict[str, Any]] = []
-        for session in sessions:
-            payload = execution_orchestrator.serialize_session(session)
-            payload["steps_count"] = len(session.steps)
+        for session, steps_count in rows:
+            payload = execution_orchestrator.serialize_session(session, summary=True)
+            payload["steps_count"] = steps_count
             if session.feedback:
                 payload["feedback"] = {
                     "was_successful": session.feedback.was_successful,
@@ -480,40 +525,39 @@ class ExecutionController(BaseController):
         offset: int = 0
     ) -> Dict[str, Any]:
         """Get all execution sessions (paginated)"""
+        if limit <= 0 or limit > 500:
+            limit = 50
+        if offset < 0:
+            offset = 0
+        
         try:
-            if limit <= 0 or limit > 500:
-                limit = 50
-            if offset < 0:
-                offset = 0
-            
-            sessions = self.execution_repo.get_by_tenant(self.tenant_id, limit, offset)
-            
-            result: List[Dict[str, Any]] = []
-            for session in sessions:
-                try:
-                    # Ensure session is attached to the current db session
-                    if session not in self.db:
-                        self.db.merge(session)
-                    
-                    payload = execution_orchestrator.serialize_session(session)
-                    runbook = self.db.query(Runbook).filter(Runbook.id == session.runbook_id).first()
-                    if runbook:
-                        if runbook.is_active == "archived":
-                            payload["runbook_title"] = f"{runbook.title} (Archived)"
-                        else:
-                            payload["runbook_title"] = runbook.title
-                    else:
-                        payload["runbook_title"] = "Unknown (Runbook Deleted)"
-                    result.append(payload)
-                except Exception as e:
-                    logger.error(f"Error serializing session {session.id}: {e}", exc_info=True)
-                    # Skip problematic sessions but continue
-                    continue
-            
-            return {"sessions": result}
+            sessions = _listing_breaker.call(
+                self.execution_repo.get_by_tenant_with_runbook, self.tenant_id, limit, offset
+            )
+        except CircuitBreakerOpen as e:
+            # Shed load while the database is failing instead of letting clients retry hard
+            raise HTTPException(
+                status_code=503,
+                detail="Execution listing temporarily unavailable",
+                headers={"Retry-After": str(e.retry_after)}
+            )
         except Exception as e:
-            logger.exception("Failed to list execution sessions: %s", e)
-            # Return empty result instead of raising error
-            return {"sessions": []}
-
-
+            self.db.rollback()
+            raise self.handle_error(e, "Failed to list execution sessions")
+        
+        # Items are independent and need no further I/O (runbooks are preloaded),
+        # so each one is serialized in a single pass; failures skip just that item
+        payloads = (self._serialize_listing_item(session) for session in sessions)
+        return {"sessions": [payload for payload in payloads if payload is not None]}
+    
+    def _serialize_listing_item(self, session: ExecutionSession) -> Optional[Dict[str, Any]]:
+        """Serialize one session for the listing, or None if it cannot be serialized"""
+        try:
+            payload = execution_orchestrator.serialize_session(session, summary=True)
+            runbook = session.runbook
+            payload["runbook_title"] = runbook.display_title if runbook else "Unknown (Runbook Deleted)"
+            return payload
+        except Exception as e:
+            logger.error(f"Error serializing session {session.id}: {e}", exc_info=True)
+            # Skip problematic sessions but continue
+            return None
@@ -1,17 +1,22 @@
 """
 Controller for runbook endpoints - handles request/response logic
 """
-import json
+import asyncio
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List
+import orjson
+from sqlalchemy import Float, cast
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
 from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse, Response
 
 from app.controllers.base_controller import BaseController
 from app.repositories.runbook_repository import RunbookRepository
 from app.services.runbook.generation import RunbookGeneratorService
 from app.services.runbook.duplicate_detection_service import DuplicateDetectionService
 from app.services.runbook.ticket_cleanup_service import TicketCleanupService
+from app.services.ticket.analysis_cache import analysis_cache
 from app.models.runbook import Runbook
 from app.models.ticket import Ticket
 from app.schemas.runbook import RunbookResponse, RunbookUpdate
@@ -20,6 +25,22 @@ from app.core.logging import get_logger
 logger = get_logger(__name__)
 
 
+# Columns the list view serializes (skips the fingerprint columns); Numeric
+# confidence is cast to float in SQL
+_LIST_COLUMNS = (
+    Runbook.id,
+    Runbook.title,
+    Runbook.body_md,
+    Runbook.meta_data,
+    cast(Runbook.confidence, Float).label("confidence"),
+    Runbook.parent_version_id,
+    Runbook.status,
+    Runbook.is_active,
+    Runbook.created_at,
+    Runbook.updated_at,
+)
+
+
 class RunbookController(BaseController):
     """Controller for runbook operations"""
     
@@ -101,7 +122,9 @@ class RunbookController(BaseController):
                     ticket.meta_data["matched_runbooks"] = []
                 
                 # Check if runbook already in list
-                existing_ids = [rb.get("id") for rb in ticket.meta_data["matched_runbooks"] if isinstance(rb, dict)]
+                # New writes are normalized (RunbookMatchingService.normalize_matches), but
+                # rows predating sql/normalize_ticket_matched_runbooks.sql may not be
+                existing_ids = {rb.get("id") for rb in ticket.meta_data["matched_runbooks"] if isinstance(rb, dict)}
                 if runbook_id not in existing_ids:
                     runbook = self.runbook_repo.get(runbook_id)
                     if runbook:
@@ -111,54 +134,90 @@ class RunbookController(BaseController):
                             "confidence_score": 1.0,  # Perfect match since it was generated for this ticket
                             "reasoning": "Runbook generated for this ticket"
                         })
-                        # Trigger SQLAlchemy to detect changes
-                        ticket.meta_data = dict(ticket.meta_data)
+                        # Plain JSON column: mark it dirty without rebuilding the dict
+                        flag_modified(ticket, "meta_data")
                         self.db.commit()
                         logger.info(f"Associated runbook {runbook_id} with ticket {ticket_id}")
         except Exception as e:
             logger.warning(f"Failed to associate runbook {runbook_id} with ticket {ticket_id}: {e}")
             # Don't fail the request if association fails
     
-    def list_runbooks(
+    async def list_runbooks(
         self,
         skip: int = 0,
         limit: int = 10
-    ) -> List[RunbookResponse]:
-        """List runbooks for the tenant"""
+    ) -> ORJSONResponse:
+        """
+        List runbooks for the tenant
+        
+        Only the listed columns are selected; rows are shaped as RunbookResponse
+        dicts and encoded once by orjson (datetimes natively), skipping per-row
+        model validation and jsonable_encoder.
+        
+        The page query (body_md included) is the one slow call here, so it is
+        the only part offloaded to a worker thread; quick primary-key paths in
+        this controller run inline on the event loop until the move to
+        AsyncSession.
+        """
         try:
-            runbooks = self.runbook_repo.get_by_tenant(
+            runbooks = await asyncio.to_thread(
+                self.runbook_repo.get_by_tenant,
                 self.tenant_id,
                 skip=skip,
                 limit=limit,
-                active_only=True
+                active_only=True,
+                columns=_LIST_COLUMNS
             )
             
-            result = []
+            result: List[Dict[str, Any]] = []
             for runbook in runbooks:
                 try:
-                    result.append(
-                        RunbookResponse(
-                            id=runbook.id,
-                            title=runbook.title,
-                            body_md=runbook.body_md,
-                            confidence=float(runbook.confidence) if runbook.confidence else None,
-                            meta_data=json.loads(runbook.meta_data) if runbook.meta_data else {},
-                            status=getattr(runbook, 'status', 'draft'),
-                            created_at=runbook.created_at or datetime.now(timezone.utc),
-                            updated_at=runbook.updated_at
-                        )
-                    )
+                    result.append({
+                        "id": runbook.id,
+                        "title": runbook.title,
+                        "body_md": runbook.body_md,
+                        "meta_data": orjson.loads(runbook.meta_data) if runbook.meta_data else {},
+                        "confidence": runbook.confidence,
+                        "parent_version_id": runbook.parent_version_id,
+                        "status": runbook.status,
+                        "is_active": runbook.is_active,
+                        "created_at": runbook.created_at or datetime.now(timezone.utc),
+                        "updated_at": runbook.updated_at
+                    })
                 except Exception as e:
                     logger.error(f"Error serializing runbook {runbook.id}: {e}")
                     # Skip problematic runbooks but continue
                     continue
-            return result
+            return ORJSONResponse(result)
         except Exception as e:
             logger.error(f"Error listing runbooks: {e}", exc_info=True)
             # Return empty list instead of raising error for list endpoints
-            return []
+            return ORJSONResponse([])
+    
+    @staticmethod
+    def _runbook_response(runbook: Runbook) -> Response:
+        """
+        Serialize a runbook row as a RunbookResponse body
+        
+        The values come straight from the ORM, so the model is built with
+        model_construct (no field validation) and dumped to JSON once; routes
+        return the Response as-is instead of re-validating via response_model.
+        """
+        body = RunbookResponse.model_construct(
+            id=runbook.id,
+            title=runbook.title,
+            body_md=runbook.body_md,
+            meta_data=runbook.parsed_meta_data,
+            confidence=float(runbook.confidence) if runbook.confidence else None,
+            parent_version_id=runbook.parent_version_id,
+            status=runbook.status,
+            is_active=runbook.is_active,
+            created_at=runbook.created_at,
+            updated_at=runbook.updated_at
+        )
+        return Response(content=body.model_dump_json(), media_type="application/json")
     
-    def get_runbook(self, runbook_id: int) -> RunbookResponse:
+    async def get_runbook(self, runbook_id: int) -> Response:
         """Get a specific runbook by ID"""
         try:
             runbook = self.runbook_repo.get_by_id_and_tenant(runbook_id, self.tenant_id)
@@ -166,27 +225,18 @@ class RunbookController(BaseController):
             if not runbook:
                 raise self.not_found("Runbook", runbook_id)
             
-            return RunbookResponse(
-                id=runbook.id,
-                title=runbook.title,
-                body_md=runbook.body_md,
-                confidence=float(runbook.confidence) if runbook.confidence else None,
-                meta_data=json.loads(runbook.meta_data) if runbook.meta_data else {},
-                status=getattr(runbook, 'status', 'draft'),
-                created_at=runbook.created_at,
-                updated_at=runbook.updated_at
-            )
+            return self._runbook_response(runbook)
         except HTTPException:
             raise
         except Exception as e:
             logger.error(f"Error getting runbook: {e}")
             raise self.handle_error(e, "Failed to get runbook")
     
-    def update_runbook(
+    async def update_runbook(
         self,
         runbook_id: int,
         runbook_update: RunbookUpdate
-    ) -> RunbookResponse:
+    ) -> Response:
         """Update a runbook"""
         try:
             runbook = self.runbook_repo.get_by_id_and_tenant(runbook_id, self.tenant_id)
@@ -202,20 +252,15 @@ class RunbookController(BaseController):
             if runbook_update.confidence is not None:
                 runbook.confidence = runbook_update.confidence
             if runbook_update.meta_data is not None:
-                runbook.meta_data = json.dumps(runbook_update.meta_data)
+                runbook.meta_data = orjson.dumps(runbook_update.meta_data).decode()
+                # The duplicate-check fingerprint is computed from meta_data
+                self.duplicate_service.fingerprint(runbook)
             
             self.db.commit()
+            analysis_cache.invalidate_tenant(self.tenant_id)
             self.db.refresh(runbook)
             
-            return RunbookResponse(
-                id=runbook.id,
-                title=runbook.title,
-                body_md=runbook.body_md,
-                confidence=float(runbook.confidence) if runbook.confidence else None,
-                meta_data=json.loads(runbook.meta_data) if runbook.meta_data else {},
-                created_at=runbook.created_at,
-                updated_at=runbook.updated_at
-            )
+            return self._runbook_response(runbook)
         except HTTPException:
             raise
         except Exception as e:
@@ -223,7 +268,7 @@ class RunbookController(BaseController):
             self.db.rollback()
             raise self.handle_error(e, "Failed to update runbook")
     
-    def delete_runbook(self, runbook_id: int) -> Dict[str, str]:
+    async def delete_runbook(self, runbook_id: int) -> Dict[str, str]:
         """Delete a runbook (soft delete)"""
         try:
             runbook = self.runbook_repo.get_by_id_and_tenant(runbook_id, self.tenant_id)
@@ -231,8 +276,9 @@ class RunbookController(BaseController):
             if not runbook:
                 raise self.not_found("Runbook", runbook_id)
             
-            # Clean up ticket references
-            self.cleanup_service.cleanup_runbook_references(
+            # Clean up ticket references (scans the tenant's tickets) off the event loop
+            await asyncio.to_thread(
+                self.cleanup_service.cleanup_runbook_references,
                 self.db,
                 runbook_id,
                 self.tenant_id
@@ -240,6 +286,7 @@ class RunbookController(BaseController):
             
             # Archive the runbook
             self.runbook_repo.archive(runbook_id, self.tenant_id)
+            analysis_cache.invalidate_tenant(self.tenant_id)
             
             return {"message": "Runbook deleted successfully"}
         except HTTPException:
@@ -302,6 +349,7 @@ class RunbookController(BaseController):
             
             # Index the runbook
             await self.generator._index_runbook_for_search(runbook, self.db)
+            analysis_cache.invalidate_tenant(self.tenant_id)
             
             return {"message": f"Successfully indexed runbook {runbook_id}"}
         except HTTPException:
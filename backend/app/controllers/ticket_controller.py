@@ -1,25 +1,92 @@
 """
 Controller for ticket endpoints - handles request/response logic
 """
+import asyncio
 from typing import Dict, Any, List, Optional
-from sqlalchemy.orm import Session
-from fastapi import HTTPException
-from datetime import datetime
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import flag_modified
+from fastapi import BackgroundTasks, HTTPException
+from fastapi.responses import ORJSONResponse
+from datetime import datetime, timezone
 
 from app.controllers.base_controller import BaseController
 from app.repositories.ticket_repository import TicketRepository
 from app.models.ticket import Ticket
+from app.models.runbook import Runbook
 from app.services.ticket_analysis_service import TicketAnalysisService
 from app.services.ticket_status_service import get_ticket_status_service
 from app.services.ticket.ticket_normalizer import TicketNormalizer
 from app.services.ticket.runbook_matching_service import RunbookMatchingService
 from app.services.execution import ExecutionEngine
 from app.services.config_service import ConfigService
+from app.core.config import settings
+from app.core.database import SessionLocal
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 
+async def _process_ticket_in_background(ticket_id: int, tenant_id: int) -> None:
+    """Analyze, match and auto-execute a ticket after the response is sent, using its own DB session"""
+    db = SessionLocal()
+    try:
+        controller = TicketController(db, tenant_id)
+        ticket = controller.ticket_repo.get_by_id_and_tenant(ticket_id, tenant_id)
+        if not ticket:
+            logger.warning(f"Ticket {ticket_id} disappeared before background processing")
+            return
+        await controller._process_ticket(ticket)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to process ticket {ticket_id} in background: {e}", exc_info=True)
+    finally:
+        db.close()
+
+
+async def _rematch_ticket_in_background(ticket_id: int, tenant_id: int) -> None:
+    """Refresh a ticket's stored runbook matches after the response is sent, using its own DB session"""
+    db = SessionLocal()
+    try:
+        controller = TicketController(db, tenant_id)
+        ticket = controller.ticket_repo.get_by_id_and_tenant(ticket_id, tenant_id)
+        if not ticket:
+            return
+        await controller._rematch_runbooks(ticket)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to refresh runbook matches for ticket {ticket_id}: {e}", exc_info=True)
+    finally:
+        db.close()
+
+
+# Caps concurrent batch ticket analyses (LLM calls) per worker
+_analysis_semaphore = asyncio.Semaphore(max(1, settings.WEBHOOK_ANALYSIS_MAX_CONCURRENCY))
+
+
+# classification_confidence by how many of the 0.5 / 0.8 cut-offs are met
+_CONFIDENCE_BUCKETS = ("low", "medium", "high")
+
+# Columns the list view serializes; raw_payload and meta_data stay in the database
+_LIST_COLUMNS = (
+    Ticket.id,
+    Ticket.source,
+    Ticket.title,
+    Ticket.description,
+    Ticket.severity,
+    Ticket.status,
+    Ticket.classification,
+    Ticket.classification_confidence,
+    Ticket.environment,
+    Ticket.service,
+    Ticket.created_at,
+    Ticket.analyzed_at,
+    Ticket.resolved_at,
+)
+
+
 class TicketController(BaseController):
     """Controller for ticket operations"""
     
@@ -33,6 +100,23 @@ class TicketController(BaseController):
         self.ticket_status_service = get_ticket_status_service()
         self.execution_engine = ExecutionEngine()
     
+    def _ticket_values(self, source: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a webhook payload into Ticket column values (received_at excluded)"""
+        ticket_data = self.normalizer.normalize(payload, source)
+        return {
+            "tenant_id": self.tenant_id,
+            "source": source,
+            "external_id": ticket_data.get("external_id"),
+            "title": ticket_data.get("title", "Untitled Alert"),
+            "description": ticket_data.get("description", ""),
+            "severity": ticket_data.get("severity", "medium"),
+            "environment": ticket_data.get("environment", "prod"),
+            "service": ticket_data.get("service"),
+            "status": "open",
+            "raw_payload": payload,
+            "meta_data": ticket_data.get("metadata", {})
+        }
+    
     async def receive_webhook(
         self,
         source: str,
@@ -40,24 +124,8 @@ class TicketController(BaseController):
     ) -> Dict[str, Any]:
         """Receive webhook from monitoring tools"""
         try:
-            # Normalize ticket data
-            ticket_data = self.normalizer.normalize(payload, source)
-            
             # Create ticket
-            ticket = Ticket(
-                tenant_id=self.tenant_id,
-                source=source,
-                external_id=ticket_data.get("external_id"),
-                title=ticket_data.get("title", "Untitled Alert"),
-                description=ticket_data.get("description", ""),
-                severity=ticket_data.get("severity", "medium"),
-                environment=ticket_data.get("environment", "prod"),
-                service=ticket_data.get("service"),
-                status="open",
-                raw_payload=payload,
-                meta_data=ticket_data.get("metadata", {}),
-                received_at=datetime.utcnow()
-            )
+            ticket = Ticket(**self._ticket_values(source, payload), received_at=datetime.utcnow())
             
             self.db.add(ticket)
             self.db.commit()
@@ -77,11 +145,78 @@ class TicketController(BaseController):
             logger.error(f"Error receiving webhook: {e}")
             raise self.handle_error(e, "Failed to process webhook")
     
+    async def receive_webhook_batch(
+        self,
+        source: str,
+        payloads: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Receive a burst of webhooks from one monitoring tool
+        
+        All tickets are written with a single executemany INSERT ... RETURNING
+        (batched by SQLAlchemy's insertmanyvalues) and one commit; analysis then
+        runs concurrently (at most WEBHOOK_ANALYSIS_MAX_CONCURRENCY calls per
+        worker), the results are applied in order and committed once.
+        """
+        if not payloads:
+            return {"tickets": [], "count": 0}
+        try:
+            received_at = datetime.utcnow()
+            rows = [
+                {**self._ticket_values(source, payload), "received_at": received_at}
+                for payload in payloads
+            ]
+            
+            stmt = insert(Ticket).returning(Ticket.id, sort_by_parameter_order=True)
+            ticket_ids = self.db.scalars(stmt, rows).all()
+            self.db.commit()
+            
+            tickets = self.db.query(Ticket).filter(Ticket.id.in_(ticket_ids)).all()
+            by_id = {t.id: t for t in tickets}
+            tickets = [by_id[ticket_id] for ticket_id in ticket_ids]
+            
+            # Only the analysis calls run concurrently (capped per worker); the
+            # shared Session is touched afterwards, one ticket at a time.
+            # Tickets are already stored, so a failed analysis only affects its own entry
+            results = await asyncio.gather(
+                *(self._analyze_capped(ticket) for ticket in tickets),
+                return_exceptions=True
+            )
+            
+            items = []
+            for ticket, result in zip(tickets, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error analyzing ticket {ticket.id}: {result}")
+                    result = {"confidence": None}
+                elif self._apply_analysis(ticket, result):
+                    self.ticket_status_service.close_as_false_positive(ticket)
+                items.append({
+                    "ticket_id": ticket.id,
+                    "status": ticket.status,
+                    "classification": ticket.classification,
+                    "confidence": result["confidence"]
+                })
+            self.db.commit()
+            
+            return {"tickets": items, "count": len(items)}
+        except Exception as e:
+            logger.error(f"Error receiving webhook batch: {e}")
+            self.db.rollback()
+            raise self.handle_error(e, "Failed to process webhook batch")
+    
     async def create_demo_ticket(
         self,
-        ticket_data: Dict[str, Any]
+        ticket_data: Dict[str, Any],
+        background_tasks: Optional[BackgroundTasks] = None
     ) -> Dict[str, Any]:
-        """Create a demo ticket for testing"""
+        """
+        Create a demo ticket for testing
+        
+        When ``background_tasks`` is given, the ticket is stored and the
+        response returns right away with its stored status ("open") and no
+        classification yet; analysis, runbook matching and auto-execution
+        run after the response is sent. The response keys are the same.
+        """
         try:
             ticket = Ticket(
                 tenant_id=self.tenant_id,
@@ -99,17 +234,25 @@ class TicketController(BaseController):
             )
             
             self.db.add(ticket)
-            self.db.commit()
-            self.db.refresh(ticket)
+            # Flush for ticket.id without committing
+            self.db.flush()
             
-            # Analyze ticket
-            analysis_result = await self._analyze_ticket(ticket)
-            
-            # Find and store matching runbooks
-            await self._find_and_store_matched_runbooks(ticket, analysis_result)
+            if background_tasks is not None:
+                # The background task reads the ticket from its own session;
+                # ticket_id is read before commit expires the instance
+                ticket_id = ticket.id
+                self.db.commit()
+                background_tasks.add_task(_process_ticket_in_background, ticket_id, self.tenant_id)
+                return {
+                    "ticket_id": ticket_id,
+                    "status": "open",
+                    "classification": None,
+                    "confidence": None,
+                    "reasoning": None
+                }
             
-            # Auto-execute if conditions are met
-            await self._auto_execute_if_eligible(ticket)
+            # Intake and analysis commit together
+            analysis_result = await self._process_ticket(ticket)
             
             self.db.commit()
             
@@ -122,35 +265,58 @@ class TicketController(BaseController):
             }
         except Exception as e:
             logger.error(f"Error creating demo ticket: {e}")
+            self.db.rollback()
             raise self.handle_error(e, "Failed to create ticket")
     
+    async def _process_ticket(self, ticket: Ticket) -> Dict[str, Any]:
+        """Analyze a stored ticket, store its runbook matches and auto-execute if eligible (no commit)"""
+        # Analyze ticket
+        analysis_result = await self._analyze_ticket(ticket)
+        
+        # Find and store matching runbooks
+        await self._find_and_store_matched_runbooks(ticket, analysis_result)
+        
+        # Auto-execute if conditions are met
+        await self._auto_execute_if_eligible(ticket)
+        
+        return analysis_result
+    
     async def _analyze_ticket(self, ticket: Ticket) -> Dict[str, Any]:
         """Analyze ticket for false positive"""
-        analysis_result = await self.analysis_service.analyze_ticket({
+        analysis_result = await self.analysis_service.analyze_ticket(self._analysis_input(ticket))
+        
+        # Close ticket if false positive
+        if self._apply_analysis(ticket, analysis_result):
+            self.ticket_status_service.update_ticket_on_false_positive(self.db, ticket.id)
+        
+        return analysis_result
+    
+    async def _analyze_capped(self, ticket: Ticket) -> Dict[str, Any]:
+        """Run the analysis call alone (no Session access) under the per-worker cap"""
+        ticket_input = self._analysis_input(ticket)
+        async with _analysis_semaphore:
+            return await self.analysis_service.analyze_ticket(ticket_input)
+    
+    @staticmethod
+    def _analysis_input(ticket: Ticket) -> Dict[str, Any]:
+        return {
             "title": ticket.title,
             "description": ticket.description,
             "severity": ticket.severity,
             "source": ticket.source
-        })
-        
-        # Update ticket with analysis
+        }
+    
+    @staticmethod
+    def _apply_analysis(ticket: Ticket, analysis_result: Dict[str, Any]) -> bool:
+        """Update ticket with analysis; True when it should be closed as a false positive"""
         ticket.classification = analysis_result["classification"]
         confidence = analysis_result["confidence"]
-        if confidence >= 0.8:
-            ticket.classification_confidence = "high"
-        elif confidence >= 0.5:
-            ticket.classification_confidence = "medium"
-        else:
-            ticket.classification_confidence = "low"
+        ticket.classification_confidence = _CONFIDENCE_BUCKETS[(confidence >= 0.5) + (confidence >= 0.8)]
         
         ticket.analyzed_at = datetime.utcnow()
         ticket.status = "analyzing"
         
-        # Close ticket if false positive
-        if analysis_result["classification"] == "false_positive" and confidence >= 0.8:
-            self.ticket_status_service.update_ticket_on_false_positive(self.db, ticket.id)
-        
-        return analysis_result
+        return analysis_result["classification"] == "false_positive" and confidence >= 0.8
     
     async def _find_and_store_matched_runbooks(
         self,
@@ -172,8 +338,22 @@ class TicketController(BaseController):
             )
             
             if matched_runbooks:
-                ticket.meta_data["matched_runbooks"] = matched_runbooks
+                ticket.meta_data["matched_runbooks"] = self.matching_service.normalize_matches(matched_runbooks)
                 logger.info(f"Found {len(matched_runbooks)} matching runbooks for ticket {ticket.id}")
+            ticket.meta_data["matched_runbooks_computed_at"] = datetime.now(timezone.utc).isoformat()
+            flag_modified(ticket, "meta_data")
+    
+    @staticmethod
+    def _matches_are_stale(meta_data: Dict[str, Any]) -> bool:
+        """True when stored matches were never stamped or are older than the TTL"""
+        computed_at = meta_data.get("matched_runbooks_computed_at")
+        if not computed_at:
+            return True
+        try:
+            age = datetime.now(timezone.utc) - datetime.fromisoformat(computed_at)
+        except (TypeError, ValueError):
+            return True
+        return age.total_seconds() > settings.MATCHED_RUNBOOKS_TTL_SECONDS
     
     async def _auto_execute_if_eligible(self, ticket: Ticket):
         """Auto-start execution if conditions are met"""
@@ -184,27 +364,34 @@ class TicketController(BaseController):
         if not matched_runbooks or len(matched_runbooks) == 0:
             return
         
-        best_match = matched_runbooks[0]
-        runbook_id = best_match.get("id")
-        match_confidence = best_match.get("confidence_score", 0.0)
-        
         # Check execution mode
         execution_mode = ConfigService.get_execution_mode(self.db, self.tenant_id)
         
         # Auto-start execution only if:
         # 1. Mode is 'auto' (not 'hil')
         # 2. Confidence is high enough (>=0.8)
-        # 3. Runbook is approved
+        # 3. The top-ranked runbook is approved
+        # The stored list is not guaranteed to be sorted (rematches append),
+        # so the top-ranked match is picked by score here
+        best_match = max(
+            (rb for rb in matched_runbooks if isinstance(rb, dict)),
+            key=lambda rb: rb.get("confidence_score") or 0.0,
+            default={}
+        )
+        runbook_id = best_match.get("id")
+        match_confidence = float(best_match.get("confidence_score") or 0.0)
+        
         if execution_mode == 'auto' and match_confidence >= 0.8 and runbook_id:
             try:
-                from app.models.runbook import Runbook
-                runbook = self.db.query(Runbook).filter(
-                    Runbook.id == runbook_id,
-                    Runbook.tenant_id == self.tenant_id,
-                    Runbook.status == "approved"
-                ).first()
+                approved = self.db.execute(
+                    select(Runbook.id).where(
+                        Runbook.id == runbook_id,
+                        Runbook.tenant_id == self.tenant_id,
+                        Runbook.status == "approved"
+                    ).limit(1)
+                ).scalar() is not None
                 
-                if runbook:
+                if approved:
                     session = await self.execution_engine.create_execution_session(
                         db=self.db,
                         runbook_id=runbook_id,
@@ -228,48 +415,79 @@ class TicketController(BaseController):
             except Exception as e:
                 logger.error(f"Failed to auto-start execution for ticket {ticket.id}: {e}")
     
-    def list_tickets(
+    async def list_tickets(
         self,
         status: Optional[str] = None,
         limit: int = 50
-    ) -> Dict[str, Any]:
-        """List tickets"""
+    ) -> ORJSONResponse:
+        """List tickets (encoded directly by orjson, bypassing jsonable_encoder)"""
         try:
-            tickets = self.ticket_repo.get_by_tenant(
+            tickets = await asyncio.to_thread(
+                self.ticket_repo.get_by_tenant,
                 self.tenant_id,
                 status=status,
-                limit=limit
+                limit=limit,
+                columns=_LIST_COLUMNS
             )
             
-            return {
-                "tickets": [
-                    {
-                        "id": t.id,
-                        "source": t.source,
-                        "title": t.title,
-                        "description": t.description,
-                        "severity": t.severity,
-                        "status": t.status,
-                        "classification": t.classification,
-                        "classification_confidence": t.classification_confidence,
-                        "environment": t.environment,
-                        "service": t.service,
-                        "created_at": t.created_at.isoformat() if t.created_at else None,
-                        "analyzed_at": t.analyzed_at.isoformat() if t.analyzed_at else None,
-                        "resolved_at": t.resolved_at.isoformat() if t.resolved_at else None
-                    }
-                    for t in tickets
-                ]
-            }
+            # Rows carry exactly the list columns; datetimes are left for
+            # orjson to encode natively (same ISO-8601 output as isoformat())
+            return ORJSONResponse({"tickets": [dict(t._mapping) for t in tickets]})
         except Exception as e:
             logger.error(f"Error listing tickets: {e}", exc_info=True)
             # Return empty result instead of raising error for list endpoints
-            return {"tickets": []}
+            return ORJSONResponse({"tickets": []})
     
-    async def get_ticket(self, ticket_id: int) -> Dict[str, Any]:
-        """Get ticket details including matched runbooks"""
+    async def _rematch_runbooks(self, ticket: Ticket) -> List[Dict[str, Any]]:
+        """Re-run semantic matching and store the merged matches in meta_data (no commit)"""
+        matched_runbooks = self.matching_service.get_matched_runbooks_from_meta(
+            self.db,
+            ticket.meta_data or {},
+            self.tenant_id
+        )
+        if ticket.classification == "false_positive":
+            return matched_runbooks
+        
+        semantic_matches = await self.matching_service.find_matching_runbooks(
+            self.db,
+            ticket.description or "",
+            ticket.title,
+            self.tenant_id,
+            ticket.classification
+        )
+        
+        # Add semantic search results, avoiding duplicates
+        existing_ids = {rb["id"] for rb in matched_runbooks}
+        for rb in semantic_matches:
+            if rb["id"] not in existing_ids:
+                matched_runbooks.append(rb)
+        
+        if not ticket.meta_data:
+            ticket.meta_data = {}
+        ticket.meta_data["matched_runbooks"] = self.matching_service.normalize_matches(matched_runbooks)
+        ticket.meta_data["matched_runbooks_computed_at"] = datetime.now(timezone.utc).isoformat()
+        flag_modified(ticket, "meta_data")
+        return matched_runbooks
+    
+    async def get_ticket(
+        self,
+        ticket_id: int,
+        background_tasks: Optional[BackgroundTasks] = None
+    ) -> ORJSONResponse:
+        """
+        Get ticket details including matched runbooks (encoded directly by orjson)
+        
+        Reads never write: the matches stored at analysis time are returned
+        as-is. When they are older than MATCHED_RUNBOOKS_TTL_SECONDS and
+        ``background_tasks`` is given, a refresh is scheduled for after the
+        response; use rematch_ticket to refresh synchronously.
+        """
         try:
-            ticket = self.ticket_repo.get_by_id_and_tenant(ticket_id, self.tenant_id)
+            ticket = self.ticket_repo.get_by_id_and_tenant(
+                ticket_id,
+                self.tenant_id,
+                options=[selectinload(Ticket.execution_sessions)]
+            )
             
             if not ticket:
                 raise self.not_found("Ticket", ticket_id)
@@ -281,29 +499,21 @@ class TicketController(BaseController):
                 self.tenant_id
             )
             
-            # Also perform semantic search for additional matches
-            if not ticket.classification or ticket.classification != "false_positive":
-                semantic_matches = await self.matching_service.find_matching_runbooks(
-                    self.db,
-                    ticket.description or "",
-                    ticket.title,
-                    self.tenant_id,
-                    ticket.classification
-                )
-                
-                # Add semantic search results, avoiding duplicates
-                existing_ids = {rb["id"] for rb in matched_runbooks}
-                for rb in semantic_matches:
-                    if rb["id"] not in existing_ids:
-                        matched_runbooks.append(rb)
+            if (
+                background_tasks is not None
+                and ticket.classification != "false_positive"
+                and self._matches_are_stale(ticket.meta_data or {})
+            ):
+                background_tasks.add_task(_rematch_ticket_in_background, ticket.id, self.tenant_id)
             
-            # Get execution sessions
-            from app.models.execution_session import ExecutionSession
-            execution_sessions = self.db.query(ExecutionSession).filter(
-                ExecutionSession.ticket_id == ticket_id
-            ).order_by(ExecutionSession.created_at.desc()).all()
+            # Execution sessions were loaded alongside the ticket; newest first
+            execution_sessions = sorted(
+                ticket.execution_sessions,
+                key=lambda es: (es.created_at is not None, es.created_at),
+                reverse=True
+            )
             
-            return {
+            return ORJSONResponse({
                 "id": ticket.id,
                 "source": ticket.source,
                 "title": ticket.title,
@@ -315,25 +525,44 @@ class TicketController(BaseController):
                 "environment": ticket.environment,
                 "service": ticket.service,
                 "meta_data": ticket.meta_data,
-                "created_at": ticket.created_at.isoformat() if ticket.created_at else None,
-                "analyzed_at": ticket.analyzed_at.isoformat() if ticket.analyzed_at else None,
-                "resolved_at": ticket.resolved_at.isoformat() if ticket.resolved_at else None,
+                "created_at": ticket.created_at,
+                "analyzed_at": ticket.analyzed_at,
+                "resolved_at": ticket.resolved_at,
                 "matched_runbooks": matched_runbooks,
                 "execution_sessions": [
                     {
                         "id": es.id,
                         "status": es.status,
-                        "created_at": es.created_at.isoformat() if es.created_at else None
+                        "created_at": es.created_at
                     }
                     for es in execution_sessions
                 ]
-            }
+            })
         except HTTPException:
             raise
         except Exception as e:
             logger.error(f"Error getting ticket {ticket_id}: {e}")
             raise self.handle_error(e, "Failed to get ticket")
     
+    async def rematch_ticket(self, ticket_id: int) -> Dict[str, Any]:
+        """Re-run runbook matching for a ticket and store the result"""
+        try:
+            ticket = self.ticket_repo.get_by_id_and_tenant(ticket_id, self.tenant_id)
+            
+            if not ticket:
+                raise self.not_found("Ticket", ticket_id)
+            
+            matched_runbooks = await self._rematch_runbooks(ticket)
+            self.db.commit()
+            
+            return {"ticket_id": ticket_id, "matched_runbooks": matched_runbooks}
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error rematching ticket {ticket_id}: {e}")
+            self.db.rollback()
+            raise self.handle_error(e, "Failed to rematch ticket")
+    
     async def execute_ticket_runbook(
         self,
         ticket_id: int,
@@ -347,7 +576,6 @@ class TicketController(BaseController):
                 raise self.not_found("Ticket", ticket_id)
             
             # Verify runbook exists and is approved
-            from app.models.runbook import Runbook
             runbook = self.db.query(Runbook).filter(
                 Runbook.id == runbook_id,
                 Runbook.tenant_id == self.tenant_id,
@@ -389,10 +617,10 @@ class TicketController(BaseController):
             logger.error(f"Error executing runbook for ticket {ticket_id}: {e}")
             raise self.handle_error(e, "Failed to execute runbook")
     
-    def cleanup_demo_tickets(self, sources: List[str]) -> Dict[str, Any]:
+    async def cleanup_demo_tickets(self, sources: List[str]) -> Dict[str, Any]:
         """Delete demo/test tickets"""
         try:
-            deleted = self.ticket_repo.delete_by_source(self.tenant_id, sources)
+            deleted = await asyncio.to_thread(self.ticket_repo.delete_by_source, self.tenant_id, sources)
             logger.info(f"Deleted {deleted} demo tickets")
             return {
                 "message": f"Deleted {deleted} demo tickets",
@@ -0,0 +1,10 @@
+"""
+Load .env into os.environ once per process, before Settings is built
+"""
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Real environment variables win over .env entries, matching the precedence
+# pydantic-settings applied when it read the file itself
+load_dotenv(Path(".env"), override=False)
@@ -1,32 +1,71 @@
 """
 Database configuration and connection management
 """
+from functools import lru_cache
+from typing import Any
+
 from sqlalchemy import create_engine, MetaData, text
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 import asyncio
+import importlib
 
 from app.core.config import settings
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
-# Create database engine (standard pooled engine for Postgres)
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=settings.DEBUG
-)
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@lru_cache(maxsize=1)
+def get_engine() -> Engine:
+    """Create the database engine (standard pooled engine for Postgres) on first use"""
+    return create_engine(
+        settings.DATABASE_URL,
+        pool_pre_ping=True,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS,
+        echo=settings.SQL_ECHO
+    )
+
+
+@lru_cache(maxsize=1)
+def _session_factory() -> sessionmaker:
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+
+
+def SessionLocal(**kwargs: Any) -> Session:
+    """Open a session; the engine and its pool are built on the first call"""
+    return _session_factory()(**kwargs)
+
+
+def __getattr__(name: str) -> Any:
+    # Keep ``from app.core.database import engine`` working without building
+    # the engine at import time
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Create base class for models
-Base = declarative_base()
+class Base(DeclarativeBase):
+    pass
+
 
 # Metadata for table creation
 metadata = MetaData()
 
+# Model modules registered on Base by init_db()
+MODEL_MODULES = (
+    "tenant", "user", "document", "chunk", "embedding", "runbook", "execution", "audit",
+    "system_config", "runbook_usage", "runbook_similarity", "runbook_citation",
+    "ticket", "credential",  # New models for Phase 2
+    "execution_session",  # Execution tracking + orchestration tables
+)
+OPTIONAL_MODEL_MODULES = (
+    "ticketing_tool_connection",  # Ticketing tool connections
+)
+
 
 def get_db():
     """Dependency to get database session"""
@@ -41,16 +80,16 @@ async def init_db():
     """Initialize database tables and extensions"""
     try:
         # Import all models to ensure they're registered
-        from app.models import tenant, user, document, chunk, embedding, runbook, execution, audit
-        from app.models import system_config, runbook_usage, runbook_similarity, runbook_citation
-        from app.models import ticket, credential  # New models for Phase 2
-        from app.models import execution_session  # Execution tracking + orchestration tables
-        try:
-            from app.models import ticketing_tool_connection  # Ticketing tool connections
-        except ImportError:
-            pass
+        for module in MODEL_MODULES:
+            importlib.import_module(f"app.models.{module}")
+        for module in OPTIONAL_MODEL_MODULES:
+            try:
+                importlib.import_module(f"app.models.{module}")
+            except ImportError:
+                pass
         
         # Enable pgvector extension
+        engine = get_engine()
         with engine.connect() as conn:
             conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
             conn.commit()
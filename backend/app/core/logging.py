@@ -1,34 +1,78 @@
 """
 Structured logging configuration with request IDs
 """
-import json
 import logging
+import os
+import random
 import re
 import sys
-import uuid
+import time
 from contextvars import ContextVar
-from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 
+import orjson
+
 
 # Context variable to store request ID for current request
 request_id_context: ContextVar[Optional[str]] = ContextVar('request_id', default=None)
 
+# Request IDs are correlation tokens, not secrets: draw them from a PRNG seeded
+# once from the OS instead of reading urandom through uuid4() per request.
+# Reseed after fork so worker processes do not share a sequence.
+_request_id_rng = random.Random(os.urandom(8))
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: _request_id_rng.seed(os.urandom(8)))
+
+
+_ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+
+_TS_FMT = "%Y-%m-%dT%H:%M:%S"
+
 
 class StructuredFormatter(logging.Formatter):
     """JSON structured formatter for logs"""
+
+    # (epoch second, formatted prefix) of the last record; bursts of logs within
+    # one second reuse the prefix instead of calling gmtime/strftime again
+    _ts_cache = (-1, "")
+
+    def __init__(self, include_source: bool = True) -> None:
+        super().__init__()
+        # Caller info (module/function/line) is only collected when logging at
+        # DEBUG; see setup_logging
+        self.include_source = include_source
+
+    def _timestamp(self, record: logging.LogRecord) -> str:
+        second = int(record.created)
+        cached_second, prefix = self._ts_cache
+        if second != cached_second:
+            prefix = time.strftime(_TS_FMT, time.gmtime(second))
+            self._ts_cache = (second, prefix)
+        return f"{prefix}.{int(record.msecs):03d}Z"
     
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as JSON"""
-        log_data = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "level": record.levelname,
-            "logger": record.name,
-            "message": record.getMessage(),
-            "module": record.module,
-            "function": record.funcName,
-            "line": record.lineno,
-        }
+        # One literal per shape: the dict is built at its final size in a single
+        # step rather than grown (and resized) key by key
+        if self.include_source:
+            log_data = {
+                "timestamp": self._timestamp(record),
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.__dict__.get("message") or record.getMessage(),
+                "module": record.module,
+                "function": record.funcName,
+                "line": record.lineno,
+            }
+        else:
+            log_data = {
+                "timestamp": self._timestamp(record),
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.__dict__.get("message") or record.getMessage(),
+            }
         
         # Add request ID if available
         request_id = request_id_context.get()
@@ -40,33 +84,44 @@ class StructuredFormatter(logging.Formatter):
             log_data["exception"] = self.formatException(record.exc_info)
         
         # Add extra fields if present
-        if hasattr(record, 'extra'):
-            log_data.update(record.__dict__.get('extra', {}))
+        extra = record.__dict__.get('extra')
+        if extra:
+            log_data.update(extra)
         
-        return json.dumps(log_data)
+        return orjson.dumps(log_data, option=_ORJSON_OPTIONS, default=str).decode()
 
 
 class RedactingFilter(logging.Filter):
     """Filter that redacts common secret patterns before formatting."""
 
-    PATTERNS = [
-        re.compile(r"(password|passwd|secret|token|api[_-]?key|private[_-]?key)\s*[:=]\s*([^\s,;]+)", re.IGNORECASE),
-        re.compile(r"(Authorization|X-Api-Key|X-Access-Token)\s*[:=]\s*([^\s,;]+)", re.IGNORECASE),
-    ]
+    PATTERN = re.compile(
+        r"(?P<k>password|passwd|secret|token|api[_-]?key|private[_-]?key"
+        r"|Authorization|X-Api-Key|X-Access-Token)\s*[:=]\s*(?P<v>[^\s,;]+)",
+        re.IGNORECASE,
+    )
+    # Every key PATTERN can match contains one of these, so records without
+    # them (nearly all) skip the regex entirely
+    TRIGGERS = ("pass", "secret", "token", "key", "authorization")
 
     def filter(self, record: logging.LogRecord) -> bool:
         try:
             message = record.getMessage()
         except Exception:
             return True
+        # Cache the formatted message so StructuredFormatter does not redo it
+        record.message = message
 
-        redacted = message
-        for pattern in self.PATTERNS:
-            redacted = pattern.sub(lambda m: f"{m.group(1)}=***", redacted)
+        if "=" not in message and ":" not in message:
+            return True
+        lowered = message.lower()
+        if not any(trigger in lowered for trigger in self.TRIGGERS):
+            return True
 
+        redacted = self.PATTERN.sub(r"\g<k>=***", message)
         if redacted != message:
             record.msg = redacted
             record.args = ()
+            record.message = redacted
         return True
 
 
@@ -76,6 +131,15 @@ def setup_logging(log_level: str = "INFO") -> None:
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
+    include_source = root_logger.level <= logging.DEBUG
+
+    # Skip LogRecord fields nothing here emits. Outside DEBUG also skip the
+    # findCaller stack walk that fills module/funcName/lineno on every record.
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    if not include_source:
+        logging._srcfile = None
     
     # Remove existing handlers
     root_logger.handlers.clear()
@@ -85,7 +149,7 @@ def setup_logging(log_level: str = "INFO") -> None:
     console_handler.setLevel(log_level)
     
     # Use structured formatter
-    formatter = StructuredFormatter()
+    formatter = StructuredFormatter(include_source=include_source)
     console_handler.setFormatter(formatter)
     console_handler.addFilter(RedactingFilter())
     
@@ -101,15 +165,16 @@ def setup_logging(log_level: str = "INFO") -> None:
     logging.getLogger("app").setLevel(log_level)
 
 
+@lru_cache(maxsize=None)
 def get_logger(name: str) -> logging.Logger:
-    """Get a logger instance with structured logging"""
+    """Get a logger instance with structured logging (memoized per name)"""
     return logging.getLogger(name)
 
 
 def set_request_id(request_id: Optional[str] = None) -> str:
     """Set request ID for current context"""
     if request_id is None:
-        request_id = str(uuid.uuid4())[:8]
+        request_id = f"{_request_id_rng.getrandbits(32):08x}"
     request_id_context.set(request_id)
     return request_id
 
@@ -2,7 +2,13 @@
 
 from __future__ import annotations
 
-from prometheus_client import Counter, Gauge, Histogram
+import os
+from functools import lru_cache
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+
+# Connector/step work ranges from tens of milliseconds to tens of seconds
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
 
 
 worker_assignments_total = Counter(
@@ -21,6 +27,12 @@ execution_step_duration_seconds = Histogram(
     "execution_step_duration_seconds",
     "Execution step duration in seconds",
     labelnames=("connector",),
+    buckets=LATENCY_BUCKETS,
+)
+
+execution_start_wait_seconds = Histogram(
+    "execution_start_wait_seconds",
+    "Time spent waiting for an execution start slot",
 )
 
 llm_tokens_total = Counter(
@@ -63,6 +75,7 @@ connector_command_latency_seconds = Histogram(
     "connector_command_latency_seconds",
     "Connector command latency in seconds",
     labelnames=("connector",),
+    buckets=LATENCY_BUCKETS,
 )
 
 connector_retry_total = Counter(
@@ -72,49 +85,120 @@ connector_retry_total = Counter(
 )
 
 
+@lru_cache(maxsize=1)
+def metrics_registry() -> CollectorRegistry:
+    """
+    Registry to expose on /metrics.
+
+    When PROMETHEUS_MULTIPROC_DIR is set (multi-worker deployments), scrape the
+    per-process files written by every worker instead of this worker's
+    in-memory metrics; observations still go through the default registry.
+    """
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+# Tenant ids arrive as ints; convert each to its label string once
+_tenant_labels: dict[int, str] = {}
+
+
+def _tenant_label(tenant: int) -> str:
+    label = _tenant_labels.get(tenant)
+    if label is None:
+        label = _tenant_labels.setdefault(tenant, str(tenant))
+    return label
+
+
+# Label children are bound once per label combination; prometheus_client's
+# own .labels() lookup takes a lock and rebuilds the label tuple every call.
+@lru_cache(maxsize=256)
+def _assign(status: str):
+    return worker_assignments_total.labels(status)
+
+
+@lru_cache(maxsize=256)
+def _state_trans(previous: str, new: str):
+    return session_state_transitions_total.labels(previous, new)
+
+
+@lru_cache(maxsize=256)
+def _step_hist(connector: str):
+    return execution_step_duration_seconds.labels(connector)
+
+
+@lru_cache(maxsize=256)
+def _llm_tokens(tenant: int, direction: str):
+    return llm_tokens_total.labels(_tenant_label(tenant), direction)
+
+
+@lru_cache(maxsize=256)
+def _llm_budget(tenant: int):
+    tenant_label = _tenant_label(tenant)
+    return (
+        llm_budget_remaining_tokens.labels(tenant_label),
+        llm_budget_total_tokens.labels(tenant_label),
+    )
+
+
+@lru_cache(maxsize=256)
+def _conn_total(connector: str, status: str):
+    return connector_command_total.labels(connector, status)
+
+
+@lru_cache(maxsize=256)
+def _conn_latency(connector: str):
+    return connector_command_latency_seconds.labels(connector)
+
+
+@lru_cache(maxsize=256)
+def _conn_retry(connector: str, reason: str):
+    return connector_retry_total.labels(connector, reason)
+
+
 def record_assignment(status: str) -> None:
-    worker_assignments_total.labels(status=status).inc()
+    _assign(status).inc()
 
 
 def record_state_transition(previous: str, new: str) -> None:
-    session_state_transitions_total.labels(from_state=previous, to_state=new).inc()
+    _state_trans(previous, new).inc()
 
 
 def observe_step_duration(connector: str, duration_seconds: float) -> None:
-    execution_step_duration_seconds.labels(connector=connector).observe(
-        max(duration_seconds, 0.0)
-    )
+    _step_hist(connector).observe(duration_seconds if duration_seconds > 0.0 else 0.0)
+
+
+def observe_execution_start_wait(duration_seconds: float) -> None:
+    execution_start_wait_seconds.observe(duration_seconds if duration_seconds > 0.0 else 0.0)
 
 
 def record_llm_tokens(tenant: int, direction: str, tokens: int) -> None:
-    llm_tokens_total.labels(tenant=str(tenant), direction=direction).inc(max(tokens, 0))
+    _llm_tokens(tenant, direction).inc(max(tokens, 0))
 
 
 def set_llm_budget_remaining(tenant: int, remaining: int, total: int) -> None:
-    tenant_label = str(tenant)
-    llm_budget_remaining_tokens.labels(tenant=tenant_label).set(max(remaining, 0))
-    llm_budget_total_tokens.labels(tenant=tenant_label).set(max(total, 0))
+    remaining_gauge, total_gauge = _llm_budget(tenant)
+    remaining_gauge.set(max(remaining, 0))
+    total_gauge.set(max(total, 0))
 
 
 def record_llm_budget_exceeded(tenant: int) -> None:
-    llm_budget_exceeded_total.labels(tenant=str(tenant)).inc()
+    llm_budget_exceeded_total.labels(_tenant_label(tenant)).inc()
 
 
 def record_llm_rate_limited(tenant: int) -> None:
-    llm_rate_limited_total.labels(tenant=str(tenant)).inc()
+    llm_rate_limited_total.labels(_tenant_label(tenant)).inc()
 
 
 def record_connector_result(connector: str, status: str) -> None:
-    connector_command_total.labels(connector=connector, status=status).inc()
+    _conn_total(connector, status).inc()
 
 
 def observe_connector_latency(connector: str, duration_seconds: float) -> None:
-    connector_command_latency_seconds.labels(connector=connector).observe(
-        max(duration_seconds, 0.0)
-    )
+    _conn_latency(connector).observe(duration_seconds if duration_seconds > 0.0 else 0.0)
 
 
 def record_connector_retry(connector: str, reason: str) -> None:
-    connector_retry_total.labels(connector=connector, reason=reason or "unknown").inc()
-
-
+    _conn_retry(connector, reason or "unknown").inc()
@@ -3,8 +3,8 @@ Minimal OpenTelemetry helpers. Tracing is optional and enabled when opentelemetr
 """
 from __future__ import annotations
 
-from contextlib import contextmanager
-from typing import Any, Dict, Iterator, Optional
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Dict, Iterator, Optional
 
 try:
     from opentelemetry import trace
@@ -14,23 +14,26 @@ except Exception:  # pragma: no cover - optional dependency
     _TRACER = None
 
 
-@contextmanager
-def tracing_span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[None]:
-    """Return a context manager that records a tracing span when OpenTelemetry is configured."""
-    if not _TRACER:
-        yield
-        return
-
-    span = _TRACER.start_span(name)
-    if attributes:
-        for key, value in attributes.items():
-            span.set_attribute(key, value)
-    try:
-        with trace.use_span(span, end_on_exit=True):
-            yield
-    finally:
-        if span.is_recording():
-            span.end()
-
-
-
+if _TRACER is None:
+    # nullcontext is stateless, so one shared instance serves every span
+    _NOOP: ContextManager[None] = nullcontext()
+
+    def tracing_span(name: str, attributes: Optional[Dict[str, Any]] = None) -> ContextManager[None]:
+        """Return a context manager that records a tracing span when OpenTelemetry is configured."""
+        return _NOOP
+
+else:
+
+    @contextmanager
+    def tracing_span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[None]:
+        """Return a context manager that records a tracing span when OpenTelemetry is configured."""
+        span = _TRACER.start_span(name)
+        if attributes:
+            for key, value in attributes.items():
+                span.set_attribute(key, value)
+        try:
+            with trace.use_span(span, end_on_exit=True):
+                yield
+        finally:
+            if span.is_recording():
+                span.end()
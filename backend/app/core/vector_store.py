@@ -2,15 +2,26 @@
 Vector Store interface and implementations
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
 import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import json
 import asyncio
+import csv
+import hashlib
+import io
+import math
+import time
 
 from app.core.config import settings
+from app.core.database import get_engine
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
 
 
 # Module-level singleton for the embedding model to avoid reloading
@@ -26,6 +37,50 @@ def get_shared_embedding_model():
     return _shared_embedding_model
 
 
+@lru_cache(maxsize=1024)
+def _cached_encode(text: str, model_id: str) -> np.ndarray:
+    """
+    Embedding of a single text, memoized per (text, model).
+
+    Kept as a read-only float32 array (~4KB at 1024 dims) rather than a tuple of
+    Python floats, which would cost ~8x the memory per entry.
+    """
+    embedding = np.asarray(get_shared_embedding_model().encode([text])[0], dtype=np.float32)
+    embedding.setflags(write=False)
+    return embedding
+
+
+# Per-process cache of the query-time index setting: name -> (expires_at, value)
+_search_param_cache: Dict[str, Tuple[float, int]] = {}
+_SEARCH_PARAM_TTL_SECONDS = 300
+
+# Batches larger than this that are entirely new are loaded with COPY
+COPY_THRESHOLD = 1024
+
+
+def _chunk_hash(text: str) -> str:
+    """Stable SHA-256 hex digest of a chunk's text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def configure_hnsw_params(vector_count: int) -> Dict[str, int]:
+    """HNSW build/search parameters for a corpus of ``vector_count`` embeddings"""
+    if vector_count < 100_000:
+        return {"m": 16, "ef_construction": 64, "ef_search": 40}
+    if vector_count <= 1_000_000:
+        return {"m": 24, "ef_construction": 100, "ef_search": 100}
+    return {"m": 32, "ef_construction": 128, "ef_search": 200}
+
+
+def configure_ivfflat_params(vector_count: int) -> Dict[str, int]:
+    """IVFFlat list/probe counts: rows/1000 lists up to 1M rows, sqrt(rows) beyond"""
+    if vector_count <= 1_000_000:
+        lists = max(vector_count // 1000, 100)
+    else:
+        lists = int(math.sqrt(vector_count))
+    return {"lists": lists, "probes": max(lists // 10, 1)}
+
+
 @dataclass
 class ChunkData:
     """Data structure for text chunks"""
@@ -89,19 +144,27 @@ class PgVectorStore(VectorStore):
     
     async def _generate_embedding(self, text: str) -> List[float]:
         """Generate embedding for text (async wrapper for blocking operation)"""
+        # Run blocking encode operation in thread pool; repeated texts (e.g. the
+        # same search query) are served from the in-process cache
+        embedding = await asyncio.to_thread(_cached_encode, text, settings.EMBEDDING_MODEL)
+        return embedding.tolist()
+    
+    async def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for many texts in one batched encode call"""
         model = self._get_model()
-        # Run blocking encode operation in thread pool
-        embedding = await asyncio.to_thread(model.encode, [text])
-        return embedding[0].tolist()
+        embeddings = await asyncio.to_thread(
+            model.encode, texts, batch_size=64, convert_to_numpy=True
+        )
+        return embeddings.tolist()
     
     def _vector_to_pg_format(self, vector: List[float]) -> str:
         """Convert vector to PostgreSQL vector format"""
         return f"[{','.join(map(str, vector))}]"
     
     def _vector_to_pg_cast(self, vector: List[float]) -> str:
-        """Convert vector to PostgreSQL vector format with proper casting"""
+        """Convert vector to PostgreSQL halfvec format with proper casting"""
         vector_str = f"[{','.join(map(str, vector))}]"
-        return f"'{vector_str}'::vector"
+        return f"'{vector_str}'::halfvec({self.embedding_dim})"
     
     def _vector_to_pg_value(self, vector: List[float]) -> str:
         """Convert vector to PostgreSQL vector value without extra quotes"""
@@ -112,53 +175,105 @@ class PgVectorStore(VectorStore):
         from app.models.chunk import Chunk
         from app.models.embedding import Embedding
         
+        # Generate missing embeddings in a single batched forward pass
+        pending = [chunk_data for chunk_data in chunks if chunk_data.embedding is None]
+        if pending:
+            embeddings = await self._generate_embeddings([chunk_data.text for chunk_data in pending])
+            for chunk_data, embedding in zip(pending, embeddings):
+                chunk_data.embedding = embedding
+        
+        # Large ingests of brand-new chunks skip the per-row ORM path
+        if len(chunks) > COPY_THRESHOLD and self._all_new(chunks, db):
+            self._copy_new_chunks(chunks, db)
+            return
+        
+        # One row per (document, text); a later duplicate wins, as it did when
+        # chunks were upserted one by one
+        rows: Dict[tuple, ChunkData] = {}
         for chunk_data in chunks:
-            # Generate embedding if not provided
-            if chunk_data.embedding is None:
-                chunk_data.embedding = await self._generate_embedding(chunk_data.text)
-            
-            # Check if chunk already exists
-            existing_chunk = db.query(Chunk).filter(
-                Chunk.document_id == chunk_data.document_id,
-                Chunk.text == chunk_data.text
-            ).first()
-            
-            if existing_chunk:
-                # Update existing chunk
-                existing_chunk.meta_data = json.dumps(chunk_data.meta_data)
-                
-                # Update embedding
-                embedding = db.query(Embedding).filter(
-                    Embedding.chunk_id == existing_chunk.id
-                ).first()
-                
-                if embedding:
-                    embedding.embedding = chunk_data.embedding
-                else:
-                    # Create new embedding
-                    new_embedding = Embedding(
-                        chunk_id=existing_chunk.id,
-                        embedding=chunk_data.embedding
-                    )
-                    db.add(new_embedding)
-            else:
-                # Create new chunk
-                new_chunk = Chunk(
-                    document_id=chunk_data.document_id,
-                    text=chunk_data.text,
-                    chunk_hash=hash(chunk_data.text),  # Simple hash for now
-                    meta_data=json.dumps(chunk_data.meta_data)
-                )
-                db.add(new_chunk)
-                db.flush()  # Get the ID
-                
-                # Create embedding
-                new_embedding = Embedding(
-                    chunk_id=new_chunk.id,
-                    embedding=chunk_data.embedding
-                )
-                db.add(new_embedding)
+            rows[(chunk_data.document_id, _chunk_hash(chunk_data.text))] = chunk_data
+        if not rows:
+            return
+        
+        # Insert or refresh all chunks in one upsert instead of a SELECT per chunk
+        chunk_stmt = pg_insert(Chunk)
+        chunk_stmt = chunk_stmt.on_conflict_do_update(
+            index_elements=[Chunk.document_id, Chunk.chunk_hash],
+            set_={"meta_data": chunk_stmt.excluded.meta_data}
+        ).returning(Chunk.id, Chunk.document_id, Chunk.chunk_hash)
+        chunk_ids = {
+            (row.document_id, row.chunk_hash): row.id
+            for row in db.execute(chunk_stmt, [
+                {
+                    "document_id": document_id,
+                    "text": chunk_data.text,
+                    "chunk_hash": chunk_hash,
+                    "meta_data": json.dumps(chunk_data.meta_data)
+                }
+                for (document_id, chunk_hash), chunk_data in rows.items()
+            ])
+        }
+        
+        embedding_stmt = pg_insert(Embedding)
+        embedding_stmt = embedding_stmt.on_conflict_do_update(
+            index_elements=[Embedding.chunk_id],
+            set_={"embedding": embedding_stmt.excluded.embedding}
+        )
+        db.execute(embedding_stmt, [
+            {"chunk_id": chunk_ids[key], "embedding": chunk_data.embedding}
+            for key, chunk_data in rows.items()
+        ])
+        
+        db.commit()
+    
+    def _all_new(self, chunks: List[ChunkData], db: Session) -> bool:
+        """True when no chunk in the batch exists yet (in the database or twice in the batch)"""
+        from app.models.chunk import Chunk
+        
+        keys = {(chunk_data.document_id, chunk_data.text) for chunk_data in chunks}
+        if len(keys) != len(chunks):
+            return False
+        document_ids = {document_id for document_id, _ in keys}
+        return db.query(Chunk.id).filter(Chunk.document_id.in_(document_ids)).first() is None
+    
+    def _copy_new_chunks(self, chunks: List[ChunkData], db: Session) -> None:
+        """Bulk-load new chunks and their embeddings with COPY"""
+        # Reserve chunk ids up front so embeddings can reference them without
+        # a RETURNING round trip or staging table
+        chunk_ids = db.execute(
+            text("SELECT nextval(pg_get_serial_sequence('chunks', 'id')) FROM generate_series(1, :n)"),
+            {"n": len(chunks)}
+        ).scalars().all()
+        
+        # QUOTE_ALL so empty strings are not read back as NULL
+        chunk_rows, embedding_rows = io.StringIO(), io.StringIO()
+        chunk_writer = csv.writer(chunk_rows, quoting=csv.QUOTE_ALL)
+        embedding_writer = csv.writer(embedding_rows, quoting=csv.QUOTE_ALL)
+        for chunk_id, chunk_data in zip(chunk_ids, chunks):
+            chunk_writer.writerow((
+                chunk_id,
+                chunk_data.document_id,
+                chunk_data.text,
+                _chunk_hash(chunk_data.text),
+                json.dumps(chunk_data.meta_data)
+            ))
+            embedding_writer.writerow((chunk_id, self._vector_to_pg_value(chunk_data.embedding)))
+        chunk_rows.seek(0)
+        embedding_rows.seek(0)
         
+        # Raw DBAPI cursor on the session's connection, so COPY joins its transaction
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                "COPY chunks (id, document_id, text, chunk_hash, meta_data) FROM STDIN WITH (FORMAT csv)",
+                chunk_rows
+            )
+            cursor.copy_expert(
+                "COPY embeddings (chunk_id, embedding) FROM STDIN WITH (FORMAT csv)",
+                embedding_rows
+            )
+        finally:
+            cursor.close()
         db.commit()
     
     async def search(
@@ -178,7 +293,7 @@ class PgVectorStore(VectorStore):
         query_vector_str = self._vector_to_pg_format(query_embedding)
         
         # Build SQL query with proper vector casting
-        # Note: We use f-string here because pgvector requires ::vector cast
+        # Note: We use f-string here because pgvector requires ::halfvec cast
         # in the SQL. SQLAlchemy text() doesn't support custom types well.
         sql = f"""
         SELECT 
@@ -188,7 +303,7 @@ class PgVectorStore(VectorStore):
             c.meta_data,
             d.title as document_title,
             d.source_type as document_source,
-            1 - (e.embedding <=> '{query_vector_str}'::vector) as score
+            1 - (e.embedding <=> '{query_vector_str}'::halfvec({self.embedding_dim})) as score
         FROM chunks c
         JOIN documents d ON c.document_id = d.id
         JOIN embeddings e ON c.id = e.chunk_id
@@ -203,10 +318,11 @@ class PgVectorStore(VectorStore):
             for i, source_type in enumerate(source_types):
                 params[f"source_type_{i}"] = source_type
         
-        sql += f" ORDER BY e.embedding <=> '{query_vector_str}'::vector LIMIT :top_k"
+        sql += f" ORDER BY e.embedding <=> '{query_vector_str}'::halfvec({self.embedding_dim}) LIMIT :top_k"
         params["top_k"] = top_k
         
         # Execute query
+        self._apply_search_params(db)
         result = db.execute(text(sql), params)
         rows = result.fetchall()
         
@@ -252,15 +368,113 @@ class PgVectorStore(VectorStore):
             
             db.commit()
     
+    def _search_param(self, db: Session) -> Tuple[str, int]:
+        """Query-time index setting (name, value) sized to the current corpus"""
+        if settings.VECTOR_INDEX_TYPE == "ivfflat":
+            name = "ivfflat.probes"
+        else:
+            name = "hnsw.ef_search"
+            if settings.HNSW_EF_SEARCH is not None:
+                return name, settings.HNSW_EF_SEARCH
+        
+        cached = _search_param_cache.get(name)
+        now = time.monotonic()
+        if cached is not None and cached[0] > now:
+            return name, cached[1]
+        
+        # Planner row estimate: a catalog lookup instead of count(*) per search
+        vector_count = db.execute(text(
+            "SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE oid = 'embeddings'::regclass"
+        )).scalar() or 0
+        if name == "ivfflat.probes":
+            value = configure_ivfflat_params(vector_count)["probes"]
+        else:
+            value = configure_hnsw_params(vector_count)["ef_search"]
+        _search_param_cache[name] = (now + _SEARCH_PARAM_TTL_SECONDS, value)
+        return name, value
+    
+    def _apply_search_params(self, db: Session) -> None:
+        """Set hnsw.ef_search / ivfflat.probes for the current transaction"""
+        name, value = self._search_param(db)
+        db.execute(
+            text("SELECT set_config(:name, :value, true)"),
+            {"name": name, "value": str(value)}
+        )
+    
     async def create_vector_index(self, db: Session) -> None:
-        """Create vector similarity index for better performance"""
-        sql = """
-        CREATE INDEX IF NOT EXISTS embeddings_embedding_idx 
-        ON embeddings USING ivfflat (embedding vector_cosine_ops) 
-        WITH (lists = 100);
-        """
-        db.execute(text(sql))
+        """Create (or rebuild) the vector similarity index sized to the current number of embeddings"""
+        vector_count = db.execute(text("SELECT count(*) FROM embeddings")).scalar() or 0
         db.commit()
+        
+        if settings.VECTOR_INDEX_TYPE == "ivfflat":
+            params = configure_ivfflat_params(vector_count)
+            name, stale_name = "embeddings_embedding_idx", "embeddings_embedding_hnsw_idx"
+            method, options = "ivfflat", {"lists": params["lists"]}
+        else:
+            params = configure_hnsw_params(vector_count)
+            name, stale_name = "embeddings_embedding_hnsw_idx", "embeddings_embedding_idx"
+            # HNSW handles incremental inserts from upsert_chunks without a rebuild
+            method, options = "hnsw", {
+                "m": settings.HNSW_M or params["m"],
+                "ef_construction": settings.HNSW_EF_CONSTRUCTION or params["ef_construction"],
+            }
+        
+        rebuilt = await asyncio.to_thread(self._build_vector_index, name, stale_name, method, options)
+        _search_param_cache.clear()
+        logger.info(
+            f"Vector index {name} {'rebuilt' if rebuilt else 'already up to date'} "
+            f"({method}, {vector_count} embeddings, {options})"
+        )
+    
+    def _build_vector_index(
+        self,
+        name: str,
+        stale_name: str,
+        method: str,
+        options: Dict[str, int]
+    ) -> bool:
+        """
+        Build ``name`` with ``options`` unless an index with those options exists.
+        
+        Runs CONCURRENTLY on a dedicated autocommit connection so searches and
+        upserts keep working; an out-of-date index is replaced by building the
+        new one under a temporary name and swapping it in.
+        """
+        wanted = sorted(f"{key}={int(value)}" for key, value in options.items())
+        with_clause = ", ".join(f"{key} = {int(value)}" for key, value in options.items())
+        building = f"{name}_new"
+        
+        with get_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            existing = conn.execute(
+                text("SELECT reloptions FROM pg_class WHERE relname = :name AND relkind = 'i'"),
+                {"name": name}
+            ).first()
+            if existing is not None and sorted(existing.reloptions or []) == wanted:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {stale_name}"))
+                return False
+            
+            conn.execute(
+                text("SELECT set_config('maintenance_work_mem', :mem, false)"),
+                {"mem": settings.VECTOR_INDEX_MAINTENANCE_WORK_MEM}
+            )
+            conn.execute(text("SELECT set_config('max_parallel_maintenance_workers', '7', false)"))
+            try:
+                # Leftover from an interrupted build (CONCURRENTLY leaves it INVALID)
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {building}"))
+                target = building if existing is not None else name
+                conn.execute(text(
+                    f"CREATE INDEX CONCURRENTLY {target} ON embeddings "
+                    f"USING {method} (embedding halfvec_cosine_ops) WITH ({with_clause})"
+                ))
+                if existing is not None:
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+                    conn.execute(text(f"ALTER INDEX {building} RENAME TO {name}"))
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {stale_name}"))
+            finally:
+                # Pooled connection: do not hand the build settings to the next user
+                conn.execute(text("RESET maintenance_work_mem"))
+                conn.execute(text("RESET max_parallel_maintenance_workers"))
+        return True
     
     async def hybrid_search(
         self,
@@ -289,7 +503,7 @@ class PgVectorStore(VectorStore):
         query_vector_str = self._vector_to_pg_format(query_embedding)
         
         # Build SQL with vector inline (needed for pgvector operators)
-        # Note: We use f-string here because pgvector requires ::vector cast
+        # Note: We use f-string here because pgvector requires ::halfvec cast
         # in the SQL. SQLAlchemy text() doesn't support custom types well.
         vector_sql = f"""
         SELECT 
@@ -299,7 +513,7 @@ class PgVectorStore(VectorStore):
             c.meta_data,
             d.title as document_title,
             d.source_type as document_source,
-            1 - (e.embedding <=> '{query_vector_str}'::vector) as vector_score
+            1 - (e.embedding <=> '{query_vector_str}'::halfvec({self.embedding_dim})) as vector_score
         FROM chunks c
         JOIN documents d ON c.document_id = d.id
         JOIN embeddings e ON c.id = e.chunk_id
@@ -315,7 +529,7 @@ class PgVectorStore(VectorStore):
                 params[f"source_type_{i}"] = source_type
         
         # Get 2x results for better recall
-        vector_sql += f" ORDER BY e.embedding <=> '{query_vector_str}'::vector LIMIT :top_k_expanded"
+        vector_sql += f" ORDER BY e.embedding <=> '{query_vector_str}'::halfvec({self.embedding_dim}) LIMIT :top_k_expanded"
         params["top_k_expanded"] = top_k * 20  # Get 20x more for better coverage
         
         # Step 2: Keyword search using PostgreSQL full-text search
@@ -343,6 +557,7 @@ class PgVectorStore(VectorStore):
         params["search_query"] = query
         
         # Execute both queries
+        self._apply_search_params(db)
         vector_result = db.execute(text(vector_sql), params)
         vector_rows = vector_result.fetchall()
         
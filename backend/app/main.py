@@ -6,12 +6,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import uvicorn
-from fastapi.responses import Response
+from fastapi.responses import ORJSONResponse, Response
 from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from app.core.config import settings
 from app.core.database import init_db
 from app.core.logging import setup_logging, get_logger
+from app.core.metrics import metrics_registry
 from app.middleware.request_id import RequestIDMiddleware
 from app.api.v1.api import api_router
 
@@ -92,7 +93,8 @@ app = FastAPI(
     title="Troubleshooting AI Agent",
     description="AI-powered IT infrastructure troubleshooting and runbook generation",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Request ID middleware (must be first)
@@ -105,6 +107,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Since-Id"],
 )
 
 # Include API routes
@@ -145,7 +148,7 @@ async def health_check():
 @app.get("/metrics")
 async def metrics_endpoint():
     """Expose Prometheus metrics."""
-    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    return Response(content=generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
 
 # Test interface redirect
 @app.get("/test")
@@ -25,6 +25,7 @@ class Chunk(Base):
     __table_args__ = (
         Index('idx_chunks_document', 'document_id'),
         Index('idx_chunks_hash', 'chunk_hash'),
+        Index('idx_chunks_document_hash', 'document_id', 'chunk_hash', unique=True),  # upsert key
     )
     
     def __repr__(self):
@@ -3,7 +3,7 @@ Credential model for storing infrastructure credentials
 POC version - simplified, stored in database (encrypted)
 For production, migrate to HashiCorp Vault or similar
 """
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index, Boolean, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -40,6 +40,11 @@ class Credential(Base):
         Index('idx_credentials_tenant', 'tenant_id'),
         Index('idx_credentials_type', 'credential_type'),
         Index('idx_credentials_env', 'environment'),
+        # Covers the credential listing query so it can be an index-only scan
+        Index(
+            'idx_credentials_tenant_env_covering', 'tenant_id', 'environment',
+            postgresql_include=['id', 'name', 'credential_type', 'host', 'port', 'database_name', 'created_at']
+        ),
     )
     
     def __repr__(self):
@@ -72,7 +77,15 @@ class InfrastructureConnection(Base):
     __table_args__ = (
         Index('idx_infrastructure_connections_tenant', 'tenant_id'),
         Index('idx_infrastructure_connections_type', 'connection_type'),
+        Index('idx_infrastructure_connections_tenant_type', 'tenant_id', 'connection_type'),
         Index('idx_infrastructure_connections_host', 'target_host'),
+        # Covers the (active-only) connection listing query so it can be an index-only scan
+        Index(
+            'idx_infrastructure_connections_tenant_env_covering',
+            'tenant_id', 'environment', 'connection_type',
+            postgresql_include=['id', 'name', 'target_host', 'target_port', 'credential_id', 'created_at'],
+            postgresql_where=text('is_active = true')
+        ),
     )
     
     def __repr__(self):
@@ -4,7 +4,7 @@ Embedding model for vector embeddings using pgvector
 from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC
 from app.core.database import Base
 from app.core.config import settings
 
@@ -14,7 +14,7 @@ class Embedding(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     chunk_id = Column(Integer, ForeignKey("chunks.id"), nullable=False, index=True)
-    embedding = Column(Vector(settings.EMBEDDING_DIMENSION), nullable=False)
+    embedding = Column(HALFVEC(settings.EMBEDDING_DIMENSION), nullable=False)  # FP16 storage
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
@@ -22,7 +22,7 @@ class Embedding(Base):
     
     # Indexes for vector similarity search
     __table_args__ = (
-        Index('idx_embeddings_chunk', 'chunk_id'),
+        Index('idx_embeddings_chunk', 'chunk_id', unique=True),  # one embedding per chunk; upsert key
         # Vector similarity index will be created via SQL
     )
     
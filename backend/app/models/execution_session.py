@@ -115,6 +115,12 @@ class ExecutionStep(Base):
     __table_args__ = (
         Index("idx_execution_steps_session", "session_id"),
         Index("idx_execution_steps_approval", "requires_approval"),
+        # Lets step progress aggregates (next incomplete step, pending approvals)
+        # run as an index-only scan instead of reading step rows
+        Index(
+            "idx_execution_steps_session_progress", "session_id", "step_number",
+            postgresql_include=["completed", "requires_approval", "approved"]
+        ),
     )
 
     def __repr__(self):
@@ -169,6 +175,8 @@ class ExecutionEvent(Base):
     __table_args__ = (
         Index("idx_execution_events_session", "session_id"),
         Index("idx_execution_events_type", "event_type"),
+        # Keyset pagination: WHERE session_id = ? AND id > ? ORDER BY id
+        Index("idx_execution_events_session_id_id", "session_id", "id"),
     )
 
 
@@ -1,9 +1,13 @@
 """
 Runbook model for generated runbooks
 """
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index, Numeric
+from typing import Any, Dict
+
+import orjson
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text, ForeignKey, Index, Numeric, case
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from sqlalchemy.ext.hybrid import hybrid_property
 from app.core.database import Base
 
 
@@ -17,10 +21,17 @@ class Runbook(Base):
     meta_data = Column(Text, nullable=True)  # JSON string with citations, etc.
     confidence = Column(Numeric(3, 2), nullable=True)  # 0.00 to 1.00
     parent_version_id = Column(Integer, ForeignKey("runbooks.id"), nullable=True)
-    status = Column(String(20), default="draft")  # draft, approved, archived
+    status = Column(String(20), nullable=False, default="draft", server_default="draft")  # draft, approved, archived
     is_active = Column(String(10), default="active")  # active, archived, draft
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # SimHash of the issue's core words plus its four 16-bit bands (see
+    # app/services/runbook/fingerprint.py); NULL until fingerprinted
+    simhash = Column(BigInteger, nullable=True)
+    simhash_band_0 = Column(Integer, nullable=True)
+    simhash_band_1 = Column(Integer, nullable=True)
+    simhash_band_2 = Column(Integer, nullable=True)
+    simhash_band_3 = Column(Integer, nullable=True)
     
     # Relationships
     tenant = relationship("Tenant")
@@ -33,8 +44,44 @@ class Runbook(Base):
         Index('idx_runbooks_title', 'title'),
         Index('idx_runbooks_confidence', 'confidence'),
         Index('idx_runbooks_parent', 'parent_version_id'),
+        Index('idx_runbooks_simhash_band_0', 'tenant_id', 'simhash_band_0'),
+        Index('idx_runbooks_simhash_band_1', 'tenant_id', 'simhash_band_1'),
+        Index('idx_runbooks_simhash_band_2', 'tenant_id', 'simhash_band_2'),
+        Index('idx_runbooks_simhash_band_3', 'tenant_id', 'simhash_band_3'),
     )
     
+    @hybrid_property
+    def display_title(self) -> str:
+        """Title as shown in listings, flagged when the runbook is archived"""
+        if self.is_active == "archived":
+            return f"{self.title} (Archived)"
+        return self.title
+    
+    @display_title.expression
+    def display_title(cls):
+        return case(
+            (cls.is_active == "archived", cls.title + " (Archived)"),
+            else_=cls.title
+        )
+    
+    @property
+    def parsed_meta_data(self) -> Dict[str, Any]:
+        """
+        meta_data decoded to a dict (empty when unset).
+        
+        The parse is memoized on the instance against the raw string, so
+        repeated reads are free and assigning a new meta_data re-parses.
+        """
+        raw = self.meta_data
+        if not raw:
+            return {}
+        cached = self.__dict__.get("_parsed_meta_data")
+        if cached is not None and cached[0] is raw:
+            return cached[1]
+        parsed = orjson.loads(raw)
+        self.__dict__["_parsed_meta_data"] = (raw, parsed)
+        return parsed
+    
     def __repr__(self):
         return f"<Runbook(id={self.id}, title='{self.title}', confidence={self.confidence})>"
 
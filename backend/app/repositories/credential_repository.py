@@ -1,7 +1,8 @@
 """
 Repository for credential data access
 """
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models.credential import Credential
 from app.repositories.base_repository import BaseRepository
@@ -23,6 +24,28 @@ class CredentialRepository(BaseRepository[Credential]):
             query = query.filter(Credential.environment == environment)
         return query.all()
     
+    def list_projection(self, tenant_id: int, environment: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get a tenant's credentials as listing dicts keyed exactly as the API emits them.
+        
+        Columns are labelled in SQL (credential_type -> "type"), so rows are
+        ready to serialize; no ORM hydration and no encrypted columns are read.
+        """
+        stmt = select(
+            Credential.id.label("id"),
+            Credential.name.label("name"),
+            Credential.credential_type.label("type"),
+            Credential.environment.label("environment"),
+            Credential.host.label("host"),
+            Credential.port.label("port"),
+            Credential.database_name.label("database_name"),
+            Credential.created_at.label("created_at")
+        ).where(Credential.tenant_id == tenant_id)
+        if environment:
+            stmt = stmt.where(Credential.environment == environment)
+        # orjson only accepts real dicts, so each RowMapping is copied once here
+        return [dict(row) for row in self.db.execute(stmt).mappings()]
+    
     def get_by_id_and_tenant(self, credential_id: int, tenant_id: int) -> Optional[Credential]:
         """Get credential by ID and tenant"""
         return self.db.query(Credential).filter(
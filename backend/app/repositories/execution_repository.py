@@ -1,9 +1,10 @@
 """
 Repository for execution session data access
 """
-from typing import Optional, List
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from datetime import datetime
+from typing import Optional, List, Sequence, Tuple
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import DateTime, Integer, Row, and_, case, cast, func, literal, select, update
 from app.models.execution_session import ExecutionSession, ExecutionStep, ExecutionFeedback
 from app.repositories.base_repository import BaseRepository
 from app.core.logging import get_logger
@@ -18,44 +19,56 @@ class ExecutionRepository(BaseRepository[ExecutionSession]):
         super().__init__(ExecutionSession, db)
     
     def get_by_id(self, session_id: int) -> Optional[ExecutionSession]:
-        """Get execution session by ID"""
-        return self.db.query(ExecutionSession).filter(
+        """Get execution session by ID (identity-map aware)"""
+        return self.db.get(ExecutionSession, session_id)
+    
+    def get_with_runbook(self, session_id: int) -> Optional[ExecutionSession]:
+        """Get execution session by ID with its runbook, steps and assignments loaded"""
+        return self.db.query(ExecutionSession).options(
+            selectinload(ExecutionSession.runbook),
+            selectinload(ExecutionSession.steps),
+            selectinload(ExecutionSession.assignments)
+        ).filter(
             ExecutionSession.id == session_id
         ).first()
     
-    def get_by_tenant(
+    def get_by_tenant_with_runbook(
         self,
         tenant_id: int,
         limit: int = 50,
         offset: int = 0
     ) -> List[ExecutionSession]:
-        """Get all execution sessions for a tenant with pagination"""
-        try:
-            from sqlalchemy.orm import joinedload
-            query = self.db.query(ExecutionSession).filter(
-                ExecutionSession.tenant_id == tenant_id
-            )
-            # Eager load relationships to avoid lazy loading issues
-            query = query.options(
-                joinedload(ExecutionSession.steps),
-                joinedload(ExecutionSession.assignments)
-            )
-            # Order by created_at (always exists)
-            query = query.order_by(ExecutionSession.created_at.desc())
-            return query.offset(offset).limit(limit).all()
-        except Exception as e:
-            logger.error(f"Error getting executions by tenant: {e}", exc_info=True)
-            # Fallback: return empty list instead of crashing
-            return []
+        """Get a page of tenant sessions with their runbook preloaded"""
+        return self.db.query(ExecutionSession).options(
+            selectinload(ExecutionSession.runbook)
+        ).filter(
+            ExecutionSession.tenant_id == tenant_id
+        ).order_by(
+            ExecutionSession.created_at.desc()
+        ).offset(offset).limit(limit).all()
     
-    def get_by_runbook(
+    def get_by_runbook_with_step_counts(
         self,
         runbook_id: int
-    ) -> List[ExecutionSession]:
-        """Get all execution sessions for a specific runbook"""
-        return self.db.query(ExecutionSession).filter(
-            ExecutionSession.runbook_id == runbook_id
-        ).order_by(ExecutionSession.started_at.desc()).all()
+    ) -> List[Row]:
+        """
+        Get a runbook's sessions with their step counts computed in SQL.
+        
+        Rows are (ExecutionSession, steps_count); feedback is preloaded.
+        """
+        steps_count = (
+            select(func.count(ExecutionStep.id))
+            .where(ExecutionStep.session_id == ExecutionSession.id)
+            .correlate(ExecutionSession)
+            .scalar_subquery()
+            .label("steps_count")
+        )
+        return self.db.execute(
+            select(ExecutionSession, steps_count)
+            .options(selectinload(ExecutionSession.feedback))
+            .where(ExecutionSession.runbook_id == runbook_id)
+            .order_by(ExecutionSession.started_at.desc())
+        ).all()
     
     def get_step(
         self,
@@ -72,6 +85,94 @@ class ExecutionRepository(BaseRepository[ExecutionSession]):
             )
         ).first()
     
+    def step_progress_summary(
+        self,
+        session_id: int
+    ) -> Tuple[Optional[int], int, Optional[int]]:
+        """
+        Aggregate step progress for a session in one query.
+        
+        Returns (next_incomplete_step_number, pending_approvals_count, last_step_number).
+        """
+        row = self.db.execute(
+            select(
+                func.min(case(
+                    (ExecutionStep.completed.is_not(True), ExecutionStep.step_number)
+                )),
+                func.count(case(
+                    (and_(
+                        ExecutionStep.requires_approval.is_(True),
+                        ExecutionStep.approved.is_(None)
+                    ), 1)
+                )),
+                func.max(ExecutionStep.step_number)
+            ).where(ExecutionStep.session_id == session_id)
+        ).one()
+        return row[0], row[1] or 0, row[2]
+    
+    def transition_status(
+        self,
+        session_id: int,
+        new_status: str,
+        completed_at: datetime,
+        default_duration: Optional[int] = None,
+        forbidden: Sequence[str] = ("completed", "failed", "abandoned")
+    ) -> Optional[Row]:
+        """
+        Move a session to a terminal status in one UPDATE ... RETURNING (caller commits).
+        
+        Duration is computed in SQL from started_at; sessions that never started
+        get ``default_duration`` (or keep their current value when None). The
+        ``forbidden`` guard is part of the WHERE clause, so concurrent transitions
+        cannot both win. Returns None when the session is missing or already in a
+        forbidden status.
+        """
+        elapsed_minutes = cast(
+            func.floor(
+                func.extract(
+                    "epoch",
+                    literal(completed_at, DateTime(timezone=True)) - ExecutionSession.started_at
+                ) / 60
+            ),
+            Integer
+        )
+        fallback = (
+            ExecutionSession.total_duration_minutes if default_duration is None
+            else literal(default_duration, Integer)
+        )
+        stmt = update(ExecutionSession).where(ExecutionSession.id == session_id)
+        if forbidden:
+            stmt = stmt.where(func.coalesce(ExecutionSession.status, "").not_in(list(forbidden)))
+        return self.db.execute(
+            stmt.values(
+                status=new_status,
+                completed_at=completed_at,
+                total_duration_minutes=case(
+                    (ExecutionSession.started_at.is_not(None), elapsed_minutes),
+                    else_=fallback
+                )
+            ).returning(
+                ExecutionSession.ticket_id,
+                ExecutionSession.runbook_id,
+                ExecutionSession.tenant_id,
+                ExecutionSession.user_id,
+                ExecutionSession.issue_description,
+                ExecutionSession.total_duration_minutes
+            ).execution_options(synchronize_session=False)
+        ).first()
+    
+    def exists(self, session_id: int) -> bool:
+        """Check that a session exists without loading it"""
+        return self.db.execute(
+            select(1).where(ExecutionSession.id == session_id).limit(1)
+        ).scalar() is not None
+    
+    def get_status(self, session_id: int) -> Optional[str]:
+        """Return a session's status, or None if it does not exist"""
+        return self.db.execute(
+            select(ExecutionSession.status).where(ExecutionSession.id == session_id)
+        ).scalar_one_or_none()
+    
     def create_feedback(
         self,
         session_id: int,
@@ -81,7 +182,7 @@ class ExecutionRepository(BaseRepository[ExecutionSession]):
         feedback_text: Optional[str] = None,
         suggestions: Optional[str] = None
     ) -> ExecutionFeedback:
-        """Create execution feedback"""
+        """Create execution feedback (flushed; caller owns the transaction)"""
         feedback = ExecutionFeedback(
             session_id=session_id,
             was_successful=was_successful,
@@ -91,8 +192,7 @@ class ExecutionRepository(BaseRepository[ExecutionSession]):
             suggestions=suggestions
         )
         self.db.add(feedback)
-        self.db.commit()
-        self.db.refresh(feedback)
+        self.db.flush()
         return feedback
 
 
@@ -1,7 +1,8 @@
 """
 Repository for infrastructure connection data access
 """
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
+from sqlalchemy import Row, insert, select, update
 from sqlalchemy.orm import Session
 from app.models.credential import InfrastructureConnection
 from app.repositories.base_repository import BaseRepository
@@ -16,15 +17,37 @@ class InfrastructureRepository(BaseRepository[InfrastructureConnection]):
     def __init__(self, db: Session):
         super().__init__(InfrastructureConnection, db)
     
-    def get_by_tenant(self, tenant_id: int, environment: Optional[str] = None) -> List[InfrastructureConnection]:
-        """Get all infrastructure connections for a tenant, optionally filtered by environment"""
-        query = self.db.query(InfrastructureConnection).filter(
+    def list_projection(
+        self,
+        tenant_id: int,
+        environment: Optional[str] = None,
+        connection_type: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a tenant's active connections as listing dicts keyed exactly as the API emits them.
+        
+        Columns are labelled in SQL (connection_type -> "type"), so rows are
+        ready to serialize without ORM hydration.
+        """
+        stmt = select(
+            InfrastructureConnection.id.label("id"),
+            InfrastructureConnection.name.label("name"),
+            InfrastructureConnection.connection_type.label("type"),
+            InfrastructureConnection.target_host.label("target_host"),
+            InfrastructureConnection.target_port.label("target_port"),
+            InfrastructureConnection.environment.label("environment"),
+            InfrastructureConnection.credential_id.label("credential_id"),
+            InfrastructureConnection.created_at.label("created_at")
+        ).where(
             InfrastructureConnection.tenant_id == tenant_id,
             InfrastructureConnection.is_active == True
         )
         if environment:
-            query = query.filter(InfrastructureConnection.environment == environment)
-        return query.all()
+            stmt = stmt.where(InfrastructureConnection.environment == environment)
+        if connection_type:
+            stmt = stmt.where(InfrastructureConnection.connection_type == connection_type)
+        # orjson only accepts real dicts, so each RowMapping is copied once here
+        return [dict(row) for row in self.db.execute(stmt).mappings()]
     
     def get_by_id_and_tenant(self, connection_id: int, tenant_id: int) -> Optional[InfrastructureConnection]:
         """Get infrastructure connection by ID and tenant"""
@@ -32,7 +55,48 @@ class InfrastructureRepository(BaseRepository[InfrastructureConnection]):
             InfrastructureConnection.id == connection_id,
             InfrastructureConnection.tenant_id == tenant_id
         ).first()
-
-
-
-
+    
+    def soft_delete(self, connection_id: int, tenant_id: int) -> int:
+        """Mark a connection inactive in a single UPDATE; returns matched row count (caller commits)"""
+        result = self.db.execute(
+            update(InfrastructureConnection)
+            .where(
+                InfrastructureConnection.id == connection_id,
+                InfrastructureConnection.tenant_id == tenant_id
+            )
+            .values(is_active=False)
+        )
+        return result.rowcount
+    
+    def update_fields(self, connection_id: int, tenant_id: int, changes: Dict[str, Any]) -> Optional[Row]:
+        """
+        Apply a partial update in a single UPDATE ... RETURNING (caller commits).
+        
+        Returns (id, name, connection_type) of the connection, or None if it does
+        not exist for the tenant.
+        """
+        columns = (
+            InfrastructureConnection.id,
+            InfrastructureConnection.name,
+            InfrastructureConnection.connection_type
+        )
+        where = (
+            InfrastructureConnection.id == connection_id,
+            InfrastructureConnection.tenant_id == tenant_id
+        )
+        if not changes:
+            return self.db.execute(select(*columns).where(*where)).first()
+        return self.db.execute(
+            update(InfrastructureConnection)
+            .where(*where)
+            .values(**changes)
+            .returning(*columns)
+        ).first()
+    
+    def insert_returning(self, **values: Any) -> Row:
+        """Insert a connection with one INSERT ... RETURNING id (caller commits)"""
+        return self.db.execute(
+            insert(InfrastructureConnection)
+            .values(**values)
+            .returning(InfrastructureConnection.id)
+        ).one()
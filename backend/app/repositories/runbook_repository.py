@@ -1,7 +1,7 @@
 """
 Repository for runbook data access
 """
-from typing import Optional, List
+from typing import Any, Optional, List, Sequence
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from app.models.runbook import Runbook
@@ -22,11 +22,18 @@ class RunbookRepository(BaseRepository[Runbook]):
         tenant_id: int,
         skip: int = 0,
         limit: int = 100,
-        active_only: bool = True
-    ) -> List[Runbook]:
-        """Get all runbooks for a tenant with pagination"""
+        active_only: bool = True,
+        columns: Optional[Sequence[Any]] = None
+    ) -> List[Any]:
+        """
+        Get all runbooks for a tenant with pagination
+        
+        With ``columns``, only those columns are selected and lightweight rows
+        are returned instead of Runbook instances.
+        """
         try:
-            query = self.db.query(Runbook).filter(Runbook.tenant_id == tenant_id)
+            query = self.db.query(*columns) if columns else self.db.query(Runbook)
+            query = query.filter(Runbook.tenant_id == tenant_id)
             
             if active_only:
                 query = query.filter(Runbook.is_active == "active")
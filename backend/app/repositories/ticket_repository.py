@@ -1,7 +1,7 @@
 """
 Repository for ticket data access
 """
-from typing import Optional, List
+from typing import Any, Optional, List, Sequence
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from app.models.ticket import Ticket
@@ -21,11 +21,18 @@ class TicketRepository(BaseRepository[Ticket]):
         self,
         tenant_id: int,
         status: Optional[str] = None,
-        limit: int = 50
-    ) -> List[Ticket]:
-        """Get all tickets for a tenant, optionally filtered by status"""
+        limit: int = 50,
+        columns: Optional[Sequence[Any]] = None
+    ) -> List[Any]:
+        """
+        Get all tickets for a tenant, optionally filtered by status
+        
+        With ``columns``, only those columns are selected and lightweight rows
+        are returned instead of Ticket instances.
+        """
         try:
-            query = self.db.query(Ticket).filter(Ticket.tenant_id == tenant_id)
+            query = self.db.query(*columns) if columns else self.db.query(Ticket)
+            query = query.filter(Ticket.tenant_id == tenant_id)
             
             if status:
                 # Handle comma-separated status values
@@ -44,10 +51,14 @@ class TicketRepository(BaseRepository[Ticket]):
     def get_by_id_and_tenant(
         self,
         ticket_id: int,
-        tenant_id: int
+        tenant_id: int,
+        options: Optional[Sequence[Any]] = None
     ) -> Optional[Ticket]:
-        """Get ticket by ID and tenant"""
-        return self.db.query(Ticket).filter(
+        """Get ticket by ID and tenant, applying any loader options (e.g. selectinload)"""
+        query = self.db.query(Ticket)
+        if options:
+            query = query.options(*options)
+        return query.filter(
             and_(
                 Ticket.id == ticket_id,
                 Ticket.tenant_id == tenant_id
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Backfill SimHash fingerprints for runbooks created before they existed.
+
+Writes only the simhash columns (updated_at is left untouched), in batches.
+Runbooks without any issue text have nothing to fingerprint and stay NULL.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session, load_only
+from app.core.database import SessionLocal
+from app.models.runbook import Runbook
+from app.services.runbook.duplicate_detection_service import DuplicateDetectionService
+
+BATCH_SIZE = 500
+FINGERPRINT_COLUMNS = ("simhash", "simhash_band_0", "simhash_band_1", "simhash_band_2", "simhash_band_3")
+
+
+def backfill_runbook_simhash() -> None:
+    """Fingerprint every runbook whose simhash is still NULL"""
+    db: Session = SessionLocal()
+    service = DuplicateDetectionService()
+    
+    # Core UPDATE would otherwise apply Runbook.updated_at's onupdate=now()
+    stmt = (
+        update(Runbook)
+        .where(Runbook.id == bindparam("runbook_id"))
+        .values(
+            {column: bindparam(f"new_{column}") for column in FINGERPRINT_COLUMNS},
+            updated_at=Runbook.updated_at
+        )
+    )
+    
+    try:
+        fingerprinted = 0
+        skipped = 0
+        last_id = 0
+        while True:
+            runbooks = db.query(Runbook).options(
+                load_only(Runbook.id, Runbook.meta_data)
+            ).filter(
+                Runbook.simhash.is_(None),
+                Runbook.id > last_id
+            ).order_by(Runbook.id).limit(BATCH_SIZE).all()
+            if not runbooks:
+                break
+            last_id = runbooks[-1].id
+            
+            rows = []
+            for runbook in runbooks:
+                try:
+                    columns = service.fingerprint_columns(runbook)
+                except (ValueError, AttributeError) as e:
+                    print(f"Cannot fingerprint runbook {runbook.id}: {e}")
+                    skipped += 1
+                    continue
+                if columns["simhash"] is None:
+                    skipped += 1
+                    continue
+                rows.append({
+                    "runbook_id": runbook.id,
+                    **{f"new_{column}": value for column, value in columns.items()}
+                })
+            
+            if rows:
+                # Core executemany on the session's connection (not ORM bulk update)
+                db.connection().execute(stmt, rows)
+                db.commit()
+                fingerprinted += len(rows)
+            db.expunge_all()
+        
+        print(f"Fingerprinted {fingerprinted} runbooks ({skipped} without issue text)")
+    except Exception as e:
+        print(f"\nFATAL ERROR: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill_runbook_simhash()
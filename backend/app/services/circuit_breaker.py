@@ -0,0 +1,78 @@
+"""
+Minimal circuit breaker for guarding calls to shared backends (e.g. the database)
+"""
+import threading
+import time
+from typing import Any, Callable, Optional, TypeVar
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitBreakerOpen(Exception):
+    """Raised instead of calling the guarded function while the circuit is open"""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"Circuit '{name}' is open; retry after {retry_after}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Opens after ``fail_max`` consecutive failures and rejects calls for
+    ``reset_timeout`` seconds; the first call after that is a trial that
+    closes the circuit on success or re-opens it on failure.
+
+    Thread-safe, so it can guard sync code running in FastAPI's threadpool.
+    """
+
+    def __init__(self, name: str, fail_max: int = 5, reset_timeout: int = 30):
+        self.name = name
+        self.fail_max = max(1, fail_max)
+        self.reset_timeout = max(1, reset_timeout)
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def _before_call(self) -> None:
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0 or self._trial_in_flight:
+                raise CircuitBreakerOpen(self.name, max(1, int(remaining + 0.999)))
+            # Half-open: let exactly one trial call through
+            self._trial_in_flight = True
+
+    def _on_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"Circuit '{self.name}' closed")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def _on_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.fail_max:
+                if self._opened_at is None:
+                    logger.warning(f"Circuit '{self.name}' opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+
+    def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Invoke ``func`` through the breaker"""
+        self._before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self._on_failure()
+            raise
+        self._on_success()
+        return result
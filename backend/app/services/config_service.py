@@ -1,13 +1,22 @@
 """
 Configuration service for managing system settings
 """
+import time
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from app.models.system_config import SystemConfig
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Tenant config is read per ticket/approval but rarely written, so stored values
+# are remembered in-process: (tenant_id, key) -> (expiry timestamp, value or None
+# when the key is unset). set_config invalidates; the TTL bounds staleness from
+# writes made by other processes.
+_CACHE_TTL_SECONDS = 30
+_CACHE_MAX_ENTRIES = 1024
+_cache: Dict[Tuple[int, str], Tuple[float, Optional[str]]] = {}
+
 
 class ConfigService:
     """Manage system configuration with tenant-specific overrides"""
@@ -16,13 +25,21 @@ class ConfigService:
     def get_config(db: Session, tenant_id: int, key: str, default: str = None) -> str:
         """Get configuration value for tenant"""
         try:
-            config = db.query(SystemConfig).filter(
-                SystemConfig.tenant_id == tenant_id,
-                SystemConfig.config_key == key
-            ).first()
+            cached = _cache.get((tenant_id, key))
+            if cached is not None and cached[0] > time.monotonic():
+                value = cached[1]
+            else:
+                config = db.query(SystemConfig).filter(
+                    SystemConfig.tenant_id == tenant_id,
+                    SystemConfig.config_key == key
+                ).first()
+                value = config.config_value if config else None
+                if len(_cache) >= _CACHE_MAX_ENTRIES:
+                    _cache.clear()
+                _cache[(tenant_id, key)] = (time.monotonic() + _CACHE_TTL_SECONDS, value)
             
-            if config:
-                return config.config_value
+            if value is not None:
+                return value
             elif default is not None:
                 return default
             else:
@@ -55,12 +72,22 @@ class ConfigService:
                 db.add(config)
             
             db.commit()
+            ConfigService.invalidate(tenant_id, key)
             logger.info(f"Config {key} updated to {value} for tenant {tenant_id}")
         except Exception as e:
             logger.error(f"Error setting config {key} for tenant {tenant_id}: {e}")
             db.rollback()
             raise
         
+    @staticmethod
+    def invalidate(tenant_id: int, key: Optional[str] = None) -> None:
+        """Drop cached config for one key, or for every key of the tenant"""
+        if key is not None:
+            _cache.pop((tenant_id, key), None)
+            return
+        for cache_key in [k for k in _cache if k[0] == tenant_id]:
+            _cache.pop(cache_key, None)
+        
     @staticmethod
     def get_confidence_threshold(db: Session, tenant_id: int) -> float:
         """Get threshold for suggesting existing runbook"""
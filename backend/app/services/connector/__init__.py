@@ -1,9 +1,9 @@
 """
 Connector services module
 """
-from app.services.connector.connector_service import ConnectorService
+from app.services.connector.connector_service import ConnectorService, get_connector_service
 
-__all__ = ["ConnectorService"]
+__all__ = ["ConnectorService", "get_connector_service"]
 
 
 
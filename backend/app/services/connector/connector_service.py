@@ -419,3 +419,14 @@ class ConnectorService:
 
 
 
+
+
+# Global connector service instance (stateless, shared across requests)
+_connector_service = None
+
+def get_connector_service() -> ConnectorService:
+    """Get singleton connector service instance"""
+    global _connector_service
+    if _connector_service is None:
+        _connector_service = ConnectorService()
+    return _connector_service
@@ -80,8 +80,8 @@ class ApprovalService:
             logger.error(f"[APPROVE_STEP] Error in execute_step for session {session_id}, step {step_number}: {e}", exc_info=True)
             raise
         
-        # Refresh session to get updated step status
-        db.refresh(session)
+        # execute_step commits, which expires the session; its attributes reload
+        # lazily on next access, so no explicit refresh round-trip is needed
         
         # Check if there are more steps
         next_step = db.query(ExecutionStep).filter(
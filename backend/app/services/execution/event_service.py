@@ -103,14 +103,19 @@ class EventService:
         since_id: Optional[int] = None,
         limit: int = 50,
     ) -> List[Dict[str, Any]]:
-        """Return serialized execution events for a session."""
+        """
+        Return serialized execution events for a session.
+        
+        Keyset pagination: pass the last seen event id as ``since_id`` to get the
+        next page (served by idx_execution_events_session_id_id).
+        """
         query = (
             db.query(ExecutionEvent)
             .filter(ExecutionEvent.session_id == session_id)
             .order_by(ExecutionEvent.id.asc())
         )
         
-        if since_id:
+        if since_id is not None:
             query = query.filter(ExecutionEvent.id > since_id)
         
         events = query.limit(limit).all()
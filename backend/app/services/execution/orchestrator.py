@@ -347,8 +347,27 @@ class ExecutionOrchestrator:
             step_number=step_number,
         )
     
-    def serialize_session(self, session: ExecutionSession) -> Dict[str, Any]:
-        """Helper to transform ExecutionSession into response payload"""
+    def serialize_session(self, session: ExecutionSession, *, summary: bool = False) -> Dict[str, Any]:
+        """
+        Helper to transform ExecutionSession into response payload
+        
+        ``summary=True`` returns only the scalar fields list views need and never
+        touches the steps/assignments relationships.
+        """
+        if summary:
+            return {
+                "id": session.id,
+                "tenant_id": session.tenant_id,
+                "runbook_id": session.runbook_id,
+                "ticket_id": session.ticket_id,
+                "status": session.status or "unknown",
+                "current_step": session.current_step,
+                "issue_description": session.issue_description,
+                "started_at": session.started_at.isoformat() if session.started_at else None,
+                "completed_at": session.completed_at.isoformat() if session.completed_at else None,
+                "total_duration_minutes": session.total_duration_minutes,
+            }
+        
         def serialize_step(step: ExecutionStep) -> Dict[str, Any]:
             try:
                 return {
@@ -3,13 +3,19 @@ Utilities for idempotency key reservation and tracking.
 """
 from __future__ import annotations
 
-from typing import Optional
+import time
+from typing import Dict, Optional, Tuple
 
 from redis.asyncio import Redis
 
 from app.core.config import settings
 from app.services.queue_client import queue_client
 
+# Committed results are remembered in-process so client retry bursts skip the
+# Redis round-trip: (scope, key) -> (expiry timestamp, committed value)
+_LOCAL_TTL_SECONDS = 60
+_LOCAL_MAX_ENTRIES = 4096
+
 
 class IdempotencyManager:
     """Reserve idempotency keys to prevent duplicate processing."""
@@ -17,6 +23,7 @@ class IdempotencyManager:
     def __init__(self, redis_client: Optional[Redis] = None) -> None:
         self._redis = redis_client or queue_client.client
         self._ttl = max(settings.IDEMPOTENCY_TTL_SECONDS, 60)
+        self._local: Dict[Tuple[str, str], Tuple[float, str]] = {}
 
     @property
     def redis(self) -> Redis:
@@ -32,6 +39,11 @@ class IdempotencyManager:
         Returns the existing value (e.g. session id / stream id) if the key was already used,
         otherwise returns None and marks the key as pending.
         """
+        cached = self._local.get((scope, key))
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                return cached[1]
+            self._local.pop((scope, key), None)
         redis_key = self._key(scope, key)
         existing = await self.redis.get(redis_key)
         if existing:
@@ -51,9 +63,15 @@ class IdempotencyManager:
         """Persist the final value for a reserved key."""
         redis_key = self._key(scope, key)
         await self.redis.set(redis_key, value, ex=self._ttl)
+        if not value:
+            return
+        if len(self._local) >= _LOCAL_MAX_ENTRIES:
+            self._local.clear()
+        self._local[(scope, key)] = (time.monotonic() + _LOCAL_TTL_SECONDS, value)
 
     async def release(self, scope: str, key: str) -> None:
         """Release a reservation (e.g. when processing failed)."""
+        self._local.pop((scope, key), None)
         redis_key = self._key(scope, key)
         await self.redis.delete(redis_key)
 
@@ -1,10 +1,12 @@
 """
 Service for detecting duplicate runbooks
 """
-import json
-from typing import Optional, Tuple
-from sqlalchemy.orm import Session
+from typing import Dict, Optional, Tuple
+from sqlalchemy import cast, func, or_
+from sqlalchemy.dialects.postgresql import BIT
+from sqlalchemy.orm import Session, load_only
 from app.models.runbook import Runbook
+from app.services.runbook.fingerprint import SIMHASH_BANDS, core_words, simhash, simhash_bands
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -13,6 +15,29 @@ logger = get_logger(__name__)
 class DuplicateDetectionService:
     """Service for detecting duplicate runbooks"""
     
+    # Fingerprinted candidates re-checked with the full text comparison
+    CANDIDATE_LIMIT = 20
+    
+    @staticmethod
+    def _fingerprint_text(runbook: Runbook) -> str:
+        """Issue text a runbook's SimHash is computed over"""
+        meta = runbook.parsed_meta_data
+        return meta.get('issue_description') or meta.get('runbook_spec', {}).get('description') or ''
+    
+    def fingerprint_columns(self, runbook: Runbook) -> Dict[str, Optional[int]]:
+        """SimHash column values (simhash, simhash_band_0..3) for the runbook's issue"""
+        value = simhash(core_words(self._fingerprint_text(runbook)))
+        bands = simhash_bands(value) if value is not None else (None,) * SIMHASH_BANDS
+        columns: Dict[str, Optional[int]] = {"simhash": value}
+        for band, band_value in enumerate(bands):
+            columns[f"simhash_band_{band}"] = band_value
+        return columns
+    
+    def fingerprint(self, runbook: Runbook) -> None:
+        """Store the SimHash (and its bands) of the runbook's issue on the row"""
+        for column, value in self.fingerprint_columns(runbook).items():
+            setattr(runbook, column, value)
+    
     def check_duplicate(
         self,
         db: Session,
@@ -22,117 +47,150 @@ class DuplicateDetectionService:
         """
         Check if a runbook already exists for the given issue description.
         Returns (is_duplicate, existing_runbook)
+        
+        SimHash fast path: runbooks sharing a 16-bit band with the issue's
+        fingerprint (always the case within Hamming distance 3) are fetched
+        nearest first and checked before anything else, so a regenerated issue
+        is found without scanning the tenant. SimHash over ~10 words is too
+        coarse to stand in for the 60% word-overlap and substring rules, so a
+        miss still falls back to checking the remaining runbooks, loading only
+        the columns the comparison reads (never body_md).
         """
         try:
             # Normalize issue description for comparison
             normalized_issue = issue_description.lower().strip()
             
-            # Extract core issue (first sentence, remove common words)
-            core_issue_parts = []
-            for word in normalized_issue.split():
-                # Remove common stop words
-                if word not in ['the', 'a', 'an', 'is', 'are', 'was', 'were', 'on', 'in', 'at', 'to', 'for', 'of', 'with']:
-                    core_issue_parts.append(word)
-            core_issue = ' '.join(core_issue_parts[:10])  # First 10 meaningful words
+            # Extract core issue (first 10 meaningful words)
+            issue_words = core_words(normalized_issue)
+            core_issue = ' '.join(issue_words)
             
-            # Get all active runbooks for this tenant (exclude archived)
-            existing_runbooks = db.query(Runbook).filter(
+            # Get active runbooks for this tenant (exclude archived)
+            active = db.query(Runbook).options(
+                load_only(Runbook.id, Runbook.tenant_id, Runbook.title, Runbook.meta_data, Runbook.simhash)
+            ).filter(
                 Runbook.tenant_id == tenant_id,
                 Runbook.is_active == "active"
-            ).all()
+            )
+            
+            candidate_ids = []
+            query_hash = simhash(issue_words)
+            if query_hash is not None:
+                bands = simhash_bands(query_hash)
+                hamming = func.bit_count(cast(Runbook.simhash.op('#')(query_hash), BIT(64)))
+                candidates = active.filter(
+                    or_(
+                        Runbook.simhash_band_0 == bands[0],
+                        Runbook.simhash_band_1 == bands[1],
+                        Runbook.simhash_band_2 == bands[2],
+                        Runbook.simhash_band_3 == bands[3]
+                    )
+                ).order_by(hamming).limit(self.CANDIDATE_LIMIT).all()
+                
+                logger.info(f"Checking {len(candidates)} SimHash candidates for duplicates...")
+                for existing_rb in candidates:
+                    if self._is_duplicate(existing_rb, normalized_issue, core_issue):
+                        return self._found(existing_rb)
+                candidate_ids = [rb.id for rb in candidates]
+            
+            remaining = active
+            if candidate_ids:
+                remaining = remaining.filter(Runbook.id.notin_(candidate_ids))
+            existing_runbooks = remaining.all()
             
             logger.info(f"Checking {len(existing_runbooks)} existing runbooks for duplicates...")
             
             for existing_rb in existing_runbooks:
-                if not existing_rb.meta_data:
-                    continue
-                    
-                try:
-                    meta = json.loads(existing_rb.meta_data) if isinstance(existing_rb.meta_data, str) else existing_rb.meta_data
-                    
-                    # Check issue_description in meta_data (primary check)
-                    existing_issue = meta.get('issue_description', '').lower().strip()
-                    
-                    # Check description in runbook_spec (secondary check - this is where LLM puts the issue)
-                    runbook_spec = meta.get('runbook_spec', {})
-                    existing_description = runbook_spec.get('description', '').lower().strip()
-                    
-                    # Extract core from existing description
-                    existing_core = None
-                    if existing_description:
-                        # Remove common suffix patterns
-                        for suffix in ['this issue requires', 'requires immediate attention', 'to prevent service disruption', 'and data loss']:
-                            if suffix in existing_description:
-                                existing_description = existing_description.split(suffix)[0].strip()
-                        
-                        # Extract core words from existing description
-                        existing_core_parts = []
-                        for word in existing_description.split():
-                            if word not in ['the', 'a', 'an', 'is', 'are', 'was', 'were', 'on', 'in', 'at', 'to', 'for', 'of', 'with']:
-                                existing_core_parts.append(word)
-                        existing_core = ' '.join(existing_core_parts[:10])
-                    
-                    # Check for duplicate
-                    is_duplicate = False
-                    
-                    # Method 1: Check against issue_description
-                    if existing_issue:
-                        existing_issue_normalized = existing_issue.lower().strip()
-                        # Check if core issues match (first 10 meaningful words)
-                        if core_issue and existing_core:
-                            # Calculate word overlap
-                            core_words = set(core_issue.split())
-                            existing_words = set(existing_core.split())
-                            if len(core_words) > 0:
-                                overlap = len(core_words & existing_words) / len(core_words)
-                                if overlap >= 0.6:  # 60% word overlap
-                                    is_duplicate = True
-                                    logger.info(f"Duplicate detected: {overlap:.1%} word overlap with runbook {existing_rb.id}")
-                        
-                        # Also check substring matches
-                        if not is_duplicate:
-                            if (normalized_issue in existing_issue_normalized or 
-                                existing_issue_normalized in normalized_issue or
-                                core_issue in existing_issue_normalized or
-                                existing_issue_normalized in core_issue):
-                                is_duplicate = True
-                                logger.info(f"Duplicate detected: substring match with runbook {existing_rb.id}")
-                    
-                    # Method 2: Check against runbook description (where LLM stores the issue)
-                    if not is_duplicate and existing_description:
-                        # Check word overlap
-                        if core_issue and existing_core:
-                            core_words = set(core_issue.split())
-                            existing_words = set(existing_core.split())
-                            if len(core_words) > 0:
-                                overlap = len(core_words & existing_words) / len(core_words)
-                                if overlap >= 0.6:  # 60% word overlap
-                                    is_duplicate = True
-                                    logger.info(f"Duplicate detected: {overlap:.1%} word overlap with runbook {existing_rb.id} description")
-                        
-                        # Also check substring matches
-                        if not is_duplicate:
-                            if (core_issue in existing_description or 
-                                existing_description.startswith(core_issue) or
-                                normalized_issue in existing_description):
-                                is_duplicate = True
-                                logger.info(f"Duplicate detected: substring match with runbook {existing_rb.id} description")
-                    
-                    if is_duplicate:
-                        logger.warning(
-                            f"Duplicate runbook detected: "
-                            f"existing ID {existing_rb.id}, title: {existing_rb.title}"
-                        )
-                        return (True, existing_rb)
-                        
-                except (json.JSONDecodeError, KeyError, AttributeError) as e:
-                    logger.debug(f"Error checking duplicate for runbook {existing_rb.id}: {e}")
-                    continue
-                    
+                if self._is_duplicate(existing_rb, normalized_issue, core_issue):
+                    return self._found(existing_rb)
+            
             return (False, None)
             
         except Exception as e:
             # If duplicate check fails, log but don't block generation
             logger.warning(f"Failed to check for duplicate runbooks: {e}. Continuing with generation.")
             return (False, None)
-
+    
+    @staticmethod
+    def _found(existing_rb: Runbook) -> Tuple[bool, Optional[Runbook]]:
+        logger.warning(
+            f"Duplicate runbook detected: "
+            f"existing ID {existing_rb.id}, title: {existing_rb.title}"
+        )
+        return (True, existing_rb)
+    
+    def _is_duplicate(self, existing_rb: Runbook, normalized_issue: str, core_issue: str) -> bool:
+        """Full text comparison of the issue against one existing runbook"""
+        if not existing_rb.meta_data:
+            return False
+        
+        try:
+            meta = existing_rb.parsed_meta_data
+            
+            # Check issue_description in meta_data (primary check)
+            existing_issue = meta.get('issue_description', '').lower().strip()
+            
+            # Check description in runbook_spec (secondary check - this is where LLM puts the issue)
+            runbook_spec = meta.get('runbook_spec', {})
+            existing_description = runbook_spec.get('description', '').lower().strip()
+            
+            # Extract core from existing description
+            existing_core = None
+            if existing_description:
+                # Remove common suffix patterns
+                for suffix in ['this issue requires', 'requires immediate attention', 'to prevent service disruption', 'and data loss']:
+                    if suffix in existing_description:
+                        existing_description = existing_description.split(suffix)[0].strip()
+                
+                # Extract core words from existing description
+                existing_core = ' '.join(core_words(existing_description))
+            
+            # Check for duplicate
+            is_duplicate = False
+            
+            # Method 1: Check against issue_description
+            if existing_issue:
+                existing_issue_normalized = existing_issue.lower().strip()
+                # Check if core issues match (first 10 meaningful words)
+                if core_issue and existing_core:
+                    # Calculate word overlap
+                    issue_word_set = set(core_issue.split())
+                    existing_words = set(existing_core.split())
+                    if len(issue_word_set) > 0:
+                        overlap = len(issue_word_set & existing_words) / len(issue_word_set)
+                        if overlap >= 0.6:  # 60% word overlap
+                            is_duplicate = True
+                            logger.info(f"Duplicate detected: {overlap:.1%} word overlap with runbook {existing_rb.id}")
+                
+                # Also check substring matches
+                if not is_duplicate:
+                    if (normalized_issue in existing_issue_normalized or 
+                        existing_issue_normalized in normalized_issue or
+                        core_issue in existing_issue_normalized or
+                        existing_issue_normalized in core_issue):
+                        is_duplicate = True
+                        logger.info(f"Duplicate detected: substring match with runbook {existing_rb.id}")
+            
+            # Method 2: Check against runbook description (where LLM stores the issue)
+            if not is_duplicate and existing_description:
+                # Check word overlap
+                if core_issue and existing_core:
+                    issue_word_set = set(core_issue.split())
+                    existing_words = set(existing_core.split())
+                    if len(issue_word_set) > 0:
+                        overlap = len(issue_word_set & existing_words) / len(issue_word_set)
+                        if overlap >= 0.6:  # 60% word overlap
+                            is_duplicate = True
+                            logger.info(f"Duplicate detected: {overlap:.1%} word overlap with runbook {existing_rb.id} description")
+                
+                # Also check substring matches
+                if not is_duplicate:
+                    if (core_issue in existing_description or 
+                        existing_description.startswith(core_issue) or
+                        normalized_issue in existing_description):
+                        is_duplicate = True
+                        logger.info(f"Duplicate detected: substring match with runbook {existing_rb.id} description")
+            
+            return is_duplicate
+        except (ValueError, KeyError, AttributeError) as e:
+            logger.debug(f"Error checking duplicate for runbook {existing_rb.id}: {e}")
+            return False
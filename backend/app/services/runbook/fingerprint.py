@@ -0,0 +1,61 @@
+"""
+Text fingerprints for cheap runbook near-duplicate lookups
+"""
+import hashlib
+from typing import Iterable, List, Optional, Tuple
+
+# Same stop-word list the duplicate check has always used for "core" words
+STOP_WORDS = frozenset(['the', 'a', 'an', 'is', 'are', 'was', 'were', 'on', 'in', 'at', 'to', 'for', 'of', 'with'])
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+SIMHASH_BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+_BAND_MASK = (1 << SIMHASH_BAND_BITS) - 1
+
+
+def core_words(text: str, limit: int = 10) -> List[str]:
+    """First ``limit`` lowercase words of ``text`` that are not stop words"""
+    words = [word for word in text.lower().split() if word not in STOP_WORDS]
+    return words[:limit]
+
+
+def _token_hash(token: str) -> int:
+    # blake2b rather than hash(): fingerprints are persisted, so they must not
+    # depend on the per-process string hash seed
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "big")
+
+
+def simhash(tokens: Iterable[str]) -> Optional[int]:
+    """
+    Charikar SimHash of ``tokens`` as a signed 64-bit integer (fits BIGINT).
+
+    Returns None when there are no tokens to fingerprint.
+    """
+    weights = [0] * SIMHASH_BITS
+    seen = False
+    for token in tokens:
+        seen = True
+        h = _token_hash(token)
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    if not seen:
+        return None
+    value = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            value |= 1 << bit
+    return value - (1 << SIMHASH_BITS) if value >= 1 << (SIMHASH_BITS - 1) else value
+
+
+def simhash_bands(value: int) -> Tuple[int, ...]:
+    """
+    Split a SimHash into SIMHASH_BANDS unsigned 16-bit bands.
+
+    Two fingerprints within Hamming distance SIMHASH_BANDS - 1 always share at
+    least one band, so an equality lookup on any band finds them.
+    """
+    unsigned = value & ((1 << SIMHASH_BITS) - 1)
+    return tuple(
+        (unsigned >> (band * SIMHASH_BAND_BITS)) & _BAND_MASK
+        for band in range(SIMHASH_BANDS)
+    )
@@ -20,6 +20,8 @@ from app.services.runbook.generation.service_classifier import ServiceClassifier
 from app.services.runbook.generation.content_builder import ContentBuilder
 from app.services.runbook.generation.yaml_processor import YamlProcessor
 from app.services.runbook.generation.runbook_indexer import RunbookIndexer
+from app.services.runbook.duplicate_detection_service import DuplicateDetectionService
+from app.services.ticket.analysis_cache import analysis_cache
 
 logger = get_logger(__name__)
 
@@ -86,6 +88,7 @@ class RunbookGeneratorService:
         
         db.add(runbook)
         db.commit()
+        analysis_cache.invalidate_tenant(tenant_id)
         db.refresh(runbook)
         
         return RunbookResponse(
@@ -668,9 +671,11 @@ class RunbookGeneratorService:
             confidence=0.75,
             is_active="active"
         )
+        DuplicateDetectionService().fingerprint(runbook)
 
         db.add(runbook)
         db.commit()
+        analysis_cache.invalidate_tenant(tenant_id)
         db.refresh(runbook)
 
         # Store citations for this runbook (from search results)
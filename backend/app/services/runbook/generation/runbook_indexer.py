@@ -7,6 +7,8 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from app.models.runbook import Runbook
 from app.schemas.runbook import RunbookResponse
+from app.services.runbook.duplicate_detection_service import DuplicateDetectionService
+from app.services.ticket.analysis_cache import analysis_cache
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -46,9 +48,11 @@ class RunbookIndexer:
             if not runbook:
                 raise HTTPException(status_code=404, detail="Runbook not found")
             
-            # Update status to approved
+            # Update status to approved and refresh its duplicate-check fingerprint
             runbook.status = 'approved'
+            DuplicateDetectionService().fingerprint(runbook)
             db.commit()
+            analysis_cache.invalidate_tenant(tenant_id)
             db.refresh(runbook)
             
             logger.info(f"Runbook {runbook_id} approved, now indexing for search")
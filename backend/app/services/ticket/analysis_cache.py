@@ -0,0 +1,85 @@
+"""
+Short-lived cache of runbook search results for the ticket analyze endpoints
+"""
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+class AnalysisCache:
+    """
+    Per-tenant TTL cache split into shards.
+
+    Every operation is a few dict reads/writes with no await in between, so no
+    lock is needed on the event loop. Entries are tagged with the tenant's
+    runbook-set version; ``invalidate_tenant`` bumps the version after any
+    runbook write, so older results are never served again and age out of the
+    shard instead of being scanned for.
+    """
+
+    def __init__(
+        self,
+        shard_count: Optional[int] = None,
+        max_entries_per_shard: int = 1024,
+        ttl_seconds: Optional[int] = None
+    ) -> None:
+        # Round the shard count up to a power of two so dispatch is a mask
+        count = max(1, shard_count or os.cpu_count() or 1)
+        count = 1 << (count - 1).bit_length()
+        self._mask = count - 1
+        self._shards: List[Dict[Tuple[int, str], Tuple[float, int, List[Dict[str, Any]]]]] = [
+            {} for _ in range(count)
+        ]
+        self._versions: Dict[int, int] = {}
+        self._max_entries = max(1, max_entries_per_shard)
+        self._ttl = max(0, ttl_seconds if ttl_seconds is not None else settings.ANALYZE_CACHE_TTL_SECONDS)
+
+    def _shard(self, key: Tuple[int, str]) -> Dict[Tuple[int, str], Tuple[float, int, List[Dict[str, Any]]]]:
+        return self._shards[hash(key) & self._mask]
+
+    def get(self, tenant_id: int, issue: str) -> Optional[List[Dict[str, Any]]]:
+        """Return cached search results, or None when missing/expired/invalidated"""
+        key = (tenant_id, issue)
+        entry = self._shard(key).get(key)
+        if (
+            entry is None
+            or entry[0] <= time.monotonic()
+            or entry[1] != self._versions.get(tenant_id, 0)
+        ):
+            return None
+        return entry[2]
+
+    def version(self, tenant_id: int) -> int:
+        """Current runbook-set version of a tenant; read it before searching"""
+        return self._versions.get(tenant_id, 0)
+
+    def set(self, tenant_id: int, issue: str, value: List[Dict[str, Any]], version: int) -> None:
+        """
+        Store search results computed at ``version``, evicting the oldest entry
+        when the shard is full. Results from before an invalidation are dropped.
+        """
+        if self._ttl <= 0 or version != self._versions.get(tenant_id, 0):
+            return
+        key = (tenant_id, issue)
+        entries = self._shard(key)
+        entries.pop(key, None)
+        if len(entries) >= self._max_entries:
+            # Dicts keep insertion order, so the first key is the oldest write
+            entries.pop(next(iter(entries)))
+        entries[key] = (time.monotonic() + self._ttl, version, value)
+
+    def invalidate_tenant(self, tenant_id: int) -> None:
+        """Drop a tenant's cached results (call after any runbook write)"""
+        self._versions[tenant_id] = self._versions.get(tenant_id, 0) + 1
+
+    def clear(self) -> None:
+        """Drop all cached results"""
+        for shard in self._shards:
+            shard.clear()
+
+
+analysis_cache = AnalysisCache()
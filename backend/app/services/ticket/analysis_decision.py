@@ -0,0 +1,80 @@
+"""
+Recommendation logic for ticket analysis
+
+Kept free of FastAPI/SQLAlchemy imports and fully annotated so the module can
+be compiled ahead of time with mypyc (``mypyc app/services/ticket/analysis_decision.py``);
+the pure-Python module is used unchanged when no compiled build is present.
+"""
+from typing import Any, Dict, List, Tuple
+
+# Confidence/threshold values live in [0, 1] and are usually exact thousandths
+# (0.8, 0.75, ...); precompute those "12.3%" renderings once so the analyze
+# path does a list lookup instead of float formatting.
+_PCT_TABLE: List[str] = [f"{i / 1000:.1%}" for i in range(1001)]
+
+
+def format_pct(value: float) -> str:
+    """Format a 0-1 ratio as a one-decimal percentage string"""
+    # Only exact thousandths hit the table; anything else would be rounded
+    # twice, so it goes through the same formatting as the table entries
+    scaled = value * 1000
+    if 0.0 <= scaled <= 1000.0 and scaled.is_integer():
+        return _PCT_TABLE[int(scaled)]
+    return f"{value:.1%}"
+
+
+def decide(
+    matched_runbooks: List[Dict[str, Any]],
+    threshold: float
+) -> Tuple[str, float, str, List[str]]:
+    """
+    Pick a recommendation from ranked runbook matches.
+
+    Returns (recommendation, confidence, reasoning, suggested_actions).
+    """
+    if not matched_runbooks:
+        # No runbooks found
+        return (
+            "generate_new",
+            0.9,
+            "No similar runbooks found in knowledge base. Suggest generating new runbook.",
+            [
+                "Generate new runbook for this issue",
+                "Review existing knowledge base for partial solutions",
+                "Consider escalating if issue is critical"
+            ]
+        )
+
+    # Check if top match exceeds threshold
+    top_match = matched_runbooks[0]
+    top_score: float = top_match['confidence_score']
+    match_count = len(matched_runbooks)
+
+    if top_score >= threshold:
+        # High confidence match
+        suggested_actions = [
+            f"Use runbook: {top_match['title']}",
+            f"Confidence: {format_pct(top_score)}",
+            "Review steps and execute"
+        ]
+        if match_count > 1:
+            suggested_actions.append(f"Also consider {match_count - 1} alternative runbook(s)")
+        return (
+            "existing_runbook",
+            top_score,
+            f"Found {match_count} similar runbook(s). Top match: {top_match['reasoning']}",
+            suggested_actions
+        )
+
+    # Low confidence - suggest generating new
+    top_pct = format_pct(top_score)
+    return (
+        "generate_new",
+        0.7,
+        f"Found {match_count} partially similar runbook(s) but confidence ({top_pct}) below threshold ({format_pct(threshold)})",
+        [
+            f"Top match only {top_pct} similar: {top_match['title']}",
+            "Consider generating a more specific runbook",
+            "Review suggested runbooks for ideas"
+        ]
+    )
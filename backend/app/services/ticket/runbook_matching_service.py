@@ -2,6 +2,7 @@
 Service for matching runbooks to tickets
 """
 from typing import List, Dict, Any, Optional
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from app.models.runbook import Runbook
 from app.core.logging import get_logger
@@ -41,22 +42,27 @@ class RunbookMatchingService:
             
             # Store all matching runbooks
             if matching_runbooks and len(matching_runbooks) > 0:
-                for match in matching_runbooks:
-                    runbook_id = match.get("id") or match.get("runbook_id")
-                    if runbook_id:
-                        # Verify runbook is active
-                        runbook = db.query(Runbook).filter(
-                            Runbook.id == runbook_id,
-                            Runbook.tenant_id == tenant_id,
-                            Runbook.is_active == "active"
-                        ).first()
-                        if runbook:
-                            matched_runbooks.append({
-                                "id": runbook_id,
-                                "title": match.get("title") or runbook.title,
-                                "confidence_score": match.get("confidence_score", 0.0),
-                                "reasoning": match.get("reasoning", "Semantic match found")
-                            })
+                matches = [
+                    (match.get("id") or match.get("runbook_id"), match)
+                    for match in matching_runbooks
+                ]
+                # Verify all candidates are still active in one query
+                active_titles = dict(
+                    db.query(Runbook.id, Runbook.title).filter(
+                        Runbook.id.in_({runbook_id for runbook_id, _ in matches if runbook_id}),
+                        Runbook.tenant_id == tenant_id,
+                        Runbook.is_active == "active"
+                    ).all()
+                )
+                for runbook_id, match in matches:
+                    title = active_titles.get(runbook_id)
+                    if title is not None:
+                        matched_runbooks.append({
+                            "id": runbook_id,
+                            "title": match.get("title") or title,
+                            "confidence_score": match.get("confidence_score", 0.0),
+                            "reasoning": match.get("reasoning", "Semantic match found")
+                        })
         except Exception as e:
             logger.warning(f"Semantic search failed: {e}")
         
@@ -82,28 +88,58 @@ class RunbookMatchingService:
             keywords = [word for word in ticket_text_lower.split() if len(word) > 4]
             
             if keywords:
-                all_active_runbooks = db.query(Runbook).filter(
+                # Let Postgres filter titles and stop at 3 hits instead of
+                # loading every approved runbook into Python
+                title_matches = db.query(Runbook.id, Runbook.title).filter(
                     Runbook.tenant_id == tenant_id,
                     Runbook.is_active == "active",
-                    Runbook.status == "approved"
-                ).all()
+                    Runbook.status == "approved",
+                    or_(*(
+                        Runbook.title.ilike(f"%{self._escape_like(keyword)}%", escape="\\")
+                        for keyword in set(keywords)
+                    ))
+                ).limit(3).all()
                 
-                for runbook in all_active_runbooks:
-                    runbook_title_lower = runbook.title.lower()
-                    if any(keyword in runbook_title_lower for keyword in keywords):
-                        matched_runbooks.append({
-                            "id": runbook.id,
-                            "title": runbook.title,
-                            "confidence_score": 0.6,
-                            "reasoning": "Keyword match: runbook title contains relevant terms"
-                        })
-                        if len(matched_runbooks) >= 3:
-                            break
+                for runbook_id, title in title_matches:
+                    matched_runbooks.append({
+                        "id": runbook_id,
+                        "title": title,
+                        "confidence_score": 0.6,
+                        "reasoning": "Keyword match: runbook title contains relevant terms"
+                    })
         except Exception as e:
             logger.warning(f"Keyword matching failed: {e}")
         
         return matched_runbooks
     
+    @staticmethod
+    def normalize_matches(matches: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Shape matches for storage in ticket meta_data["matched_runbooks"].
+        
+        Every stored entry is a dict with an int "id", so readers can index
+        entries directly; entries without a usable id are dropped.
+        """
+        normalized = []
+        for match in matches or []:
+            if not isinstance(match, dict):
+                continue
+            rb_id = match.get("id") or match.get("runbook_id")
+            try:
+                rb_id = int(rb_id)
+            except (TypeError, ValueError):
+                continue
+            entry = dict(match)
+            entry.pop("runbook_id", None)
+            entry["id"] = rb_id
+            normalized.append(entry)
+        return normalized
+    
+    @staticmethod
+    def _escape_like(value: str) -> str:
+        """Escape LIKE wildcards so keywords match literally"""
+        return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    
     def get_matched_runbooks_from_meta(
         self,
         db: Session,
@@ -120,22 +156,33 @@ class RunbookMatchingService:
         if not stored_runbooks or not isinstance(stored_runbooks, list):
             return matched_runbooks
         
+        stored = []
         for stored_rb in stored_runbooks:
             if isinstance(stored_rb, dict):
                 rb_id = stored_rb.get("id") or stored_rb.get("runbook_id")
                 if rb_id:
-                    runbook = db.query(Runbook).filter(
-                        Runbook.id == int(rb_id),
-                        Runbook.tenant_id == tenant_id,
-                        Runbook.is_active == "active"
-                    ).first()
-                    if runbook:
-                        matched_runbooks.append({
-                            "id": int(rb_id),
-                            "title": stored_rb.get("title") or runbook.title,
-                            "confidence_score": stored_rb.get("confidence_score", 1.0),
-                            "reasoning": stored_rb.get("reasoning", "Previously matched runbook")
-                        })
+                    stored.append((int(rb_id), stored_rb))
+        if not stored:
+            return matched_runbooks
+        
+        # Resolve every stored id in one IN query instead of one lookup per entry
+        active_titles = dict(
+            db.query(Runbook.id, Runbook.title).filter(
+                Runbook.id.in_({rb_id for rb_id, _ in stored}),
+                Runbook.tenant_id == tenant_id,
+                Runbook.is_active == "active"
+            ).all()
+        )
+        
+        for rb_id, stored_rb in stored:
+            title = active_titles.get(rb_id)
+            if title is not None:
+                matched_runbooks.append({
+                    "id": rb_id,
+                    "title": stored_rb.get("title") or title,
+                    "confidence_score": stored_rb.get("confidence_score", 1.0),
+                    "reasoning": stored_rb.get("reasoning", "Previously matched runbook")
+                })
         
         return matched_runbooks
 
@@ -1,57 +1,74 @@
 """
 Service for normalizing ticket data from various sources
 """
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Tuple
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# (title, description, severity, external_id) extracted from a source payload
+_Fields = Tuple[Any, Any, Any, Any]
+
+
+def _from_prometheus(payload: Dict[str, Any]) -> _Fields:
+    return (
+        payload.get("groupLabels", {}).get("alertname", "Alert"),
+        payload.get("annotations", {}).get("description", ""),
+        payload.get("labels", {}).get("severity", "medium"),
+        payload.get("fingerprint")
+    )
+
+
+def _from_datadog(payload: Dict[str, Any]) -> _Fields:
+    return (
+        payload.get("title", "Datadog Alert"),
+        payload.get("text", ""),
+        payload.get("priority", "normal"),
+        payload.get("id")
+    )
+
+
+def _from_pagerduty(payload: Dict[str, Any]) -> _Fields:
+    return (
+        payload.get("summary", "PagerDuty Incident"),
+        payload.get("description", ""),
+        payload.get("urgency", "medium"),
+        payload.get("id")
+    )
+
+
+def _from_generic(payload: Dict[str, Any]) -> _Fields:
+    return (
+        payload.get("title", payload.get("summary", "Alert")),
+        payload.get("description", payload.get("body", "")),
+        payload.get("severity", payload.get("priority", "medium")),
+        payload.get("id", payload.get("external_id"))
+    )
+
 
 class TicketNormalizer:
     """Service for normalizing ticket data from various monitoring sources"""
-    
+
+    # Source -> field extractor; unknown sources use the generic format
+    _HANDLERS: Dict[str, Callable[[Dict[str, Any]], _Fields]] = {
+        "prometheus": _from_prometheus,
+        "datadog": _from_datadog,
+        "pagerduty": _from_pagerduty,
+    }
+
     @staticmethod
     def normalize(payload: Dict[str, Any], source: str) -> Dict[str, Any]:
         """Normalize ticket data from various sources"""
-        normalized = {
-            "external_id": None,
-            "title": "",
-            "description": "",
-            "severity": "medium",
+        title, description, severity, external_id = TicketNormalizer._HANDLERS.get(
+            source, _from_generic
+        )(payload)
+
+        return {
+            "external_id": external_id,
+            "title": title,
+            "description": description,
+            "severity": severity,
             "environment": "prod",
             "service": None,
-            "metadata": {}
+            "metadata": payload
         }
-        
-        if source == "prometheus":
-            normalized["title"] = payload.get("groupLabels", {}).get("alertname", "Alert")
-            normalized["description"] = payload.get("annotations", {}).get("description", "")
-            normalized["severity"] = payload.get("labels", {}).get("severity", "medium")
-            normalized["external_id"] = payload.get("fingerprint")
-        
-        elif source == "datadog":
-            normalized["title"] = payload.get("title", "Datadog Alert")
-            normalized["description"] = payload.get("text", "")
-            normalized["severity"] = payload.get("priority", "normal")
-            normalized["external_id"] = payload.get("id")
-        
-        elif source == "pagerduty":
-            normalized["title"] = payload.get("summary", "PagerDuty Incident")
-            normalized["description"] = payload.get("description", "")
-            normalized["severity"] = payload.get("urgency", "medium")
-            normalized["external_id"] = payload.get("id")
-        
-        else:
-            # Generic format
-            normalized["title"] = payload.get("title", payload.get("summary", "Alert"))
-            normalized["description"] = payload.get("description", payload.get("body", ""))
-            normalized["severity"] = payload.get("severity", payload.get("priority", "medium"))
-            normalized["external_id"] = payload.get("id", payload.get("external_id"))
-        
-        normalized["metadata"] = payload
-        
-        return normalized
-
-
-
-
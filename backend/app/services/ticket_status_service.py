@@ -1,12 +1,13 @@
 """
 Ticket Status Service - Update ticket status based on execution lifecycle
 """
+from sqlalchemy import case, update
 from sqlalchemy.orm import Session
 from app.core.logging import get_logger
 from app.models.ticket import Ticket
 from app.models.execution_session import ExecutionSession
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
 logger = get_logger(__name__)
 
@@ -58,24 +59,11 @@ class TicketStatusService:
                 return None
             
             # Determine ticket status based on execution result
-            if execution_status == "completed":
-                if issue_resolved is True:
-                    ticket.status = "resolved"
+            new_status = self._status_for_execution(execution_status, issue_resolved)
+            if new_status:
+                ticket.status = new_status
+                if new_status == "resolved":
                     ticket.resolved_at = datetime.now()
-                elif issue_resolved is False:
-                    ticket.status = "escalated"
-                else:
-                    # If resolution status unknown, mark as in_progress for manual review
-                    ticket.status = "in_progress"
-            
-            elif execution_status == "failed":
-                ticket.status = "escalated"
-            
-            elif execution_status == "rejected":
-                ticket.status = "in_progress"  # Keep as in_progress for retry
-            
-            elif execution_status == "abandoned":
-                ticket.status = "escalated"  # Escalate if abandoned
             
             ticket.updated_at = datetime.now()
             db.commit()
@@ -89,6 +77,70 @@ class TicketStatusService:
             db.rollback()
             return None
     
+    def bulk_update_on_execution_complete(self, db: Session, mapping: Dict[int, str]) -> int:
+        """
+        Update many tickets from their execution outcomes in one UPDATE
+        
+        Args:
+            db: Database session
+            mapping: Ticket ID -> execution status ('failed', 'rejected', 'abandoned', 'completed')
+        
+        Each ticket gets its own outcome; resolution is unknown in bulk, so a
+        'completed' outcome leaves the ticket in_progress for manual review,
+        as the single-ticket update does without issue_resolved.
+        Returns the number of tickets updated.
+        """
+        new_statuses = {
+            ticket_id: new_status
+            for ticket_id, execution_status in mapping.items()
+            if (new_status := self._status_for_execution(execution_status, None))
+        }
+        if not new_statuses:
+            return 0
+        
+        try:
+            result = db.execute(
+                update(Ticket)
+                .where(Ticket.id.in_(list(new_statuses)))
+                .values(
+                    status=case(new_statuses, value=Ticket.id, else_=Ticket.status),
+                    updated_at=datetime.now()
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            logger.info(f"Bulk-updated status of {result.rowcount} ticket(s) from execution outcomes")
+            return result.rowcount
+        except Exception as e:
+            logger.error(f"Error bulk-updating ticket statuses: {e}")
+            db.rollback()
+            return 0
+    
+    @staticmethod
+    def _status_for_execution(execution_status: str, issue_resolved: Optional[bool]) -> Optional[str]:
+        """Map an execution outcome to the resulting ticket status (None = leave unchanged)"""
+        if execution_status == "completed":
+            if issue_resolved is True:
+                return "resolved"
+            if issue_resolved is False:
+                return "escalated"
+            # If resolution status unknown, mark as in_progress for manual review
+            return "in_progress"
+        if execution_status == "failed":
+            return "escalated"
+        if execution_status == "rejected":
+            return "in_progress"  # Keep as in_progress for retry
+        if execution_status == "abandoned":
+            return "escalated"  # Escalate if abandoned
+        return None
+    
+    @staticmethod
+    def close_as_false_positive(ticket: Ticket) -> None:
+        """Mark a loaded ticket closed as a false positive (no commit)"""
+        ticket.status = "closed"
+        ticket.resolved_at = datetime.now()
+        ticket.updated_at = datetime.now()
+    
     def update_ticket_on_false_positive(self, db: Session, ticket_id: int) -> Optional[Ticket]:
         """Update ticket status to 'closed' when false positive detected"""
         try:
@@ -97,9 +149,7 @@ class TicketStatusService:
                 logger.warning(f"Ticket {ticket_id} not found for status update")
                 return None
             
-            ticket.status = "closed"
-            ticket.resolved_at = datetime.now()
-            ticket.updated_at = datetime.now()
+            self.close_as_false_positive(ticket)
             db.commit()
             db.refresh(ticket)
             
@@ -0,0 +1,46 @@
+-- Unique keys for PgVectorStore.upsert_chunks, which upserts with
+--   INSERT INTO chunks ... ON CONFLICT (document_id, chunk_hash) DO UPDATE
+--   INSERT INTO embeddings ... ON CONFLICT (chunk_id) DO UPDATE
+
+-- chunk_hash used to hold Python's per-process hash(); recompute it as the
+-- SHA-256 hex digest the application now writes
+UPDATE chunks
+SET chunk_hash = encode(sha256(convert_to(text, 'UTF8')), 'hex')
+WHERE chunk_hash IS DISTINCT FROM encode(sha256(convert_to(text, 'UTF8')), 'hex');
+
+-- Drop any duplicate chunks (same document and text), keeping the oldest row.
+-- runbook_citations.chunk_id cascades on delete, so first re-point citations
+-- at the surviving chunk instead of losing them with the duplicate.
+UPDATE runbook_citations rc
+SET chunk_id = keep.keep_id
+FROM (
+    SELECT id,
+           MIN(id) OVER (PARTITION BY document_id, chunk_hash) AS keep_id
+    FROM chunks
+) keep
+WHERE rc.chunk_id = keep.id
+  AND keep.id <> keep.keep_id;
+
+DELETE FROM embeddings e
+USING chunks c, chunks keep
+WHERE e.chunk_id = c.id
+  AND keep.document_id = c.document_id
+  AND keep.chunk_hash = c.chunk_hash
+  AND keep.id < c.id;
+
+DELETE FROM chunks c
+USING chunks keep
+WHERE keep.document_id = c.document_id
+  AND keep.chunk_hash = c.chunk_hash
+  AND keep.id < c.id;
+
+-- Keep only the newest embedding per chunk
+DELETE FROM embeddings e
+USING embeddings newer
+WHERE newer.chunk_id = e.chunk_id
+  AND newer.id > e.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_chunks_document_hash ON chunks(document_id, chunk_hash);
+
+DROP INDEX IF EXISTS idx_embeddings_chunk;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_embeddings_chunk ON embeddings(chunk_id);
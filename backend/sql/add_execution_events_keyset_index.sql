@@ -0,0 +1,6 @@
+-- Composite index for keyset-paginated event polling
+-- Serves: SELECT ... FROM execution_events WHERE session_id = ? AND id > ? ORDER BY id LIMIT ?
+-- as a single index range scan instead of filtering every event of the session.
+
+CREATE INDEX IF NOT EXISTS idx_execution_events_session_id_id
+    ON execution_events(session_id, id);
@@ -0,0 +1,9 @@
+-- Covering index for per-session step progress aggregates
+-- Serves ExecutionRepository.step_progress_summary (min incomplete step_number,
+-- pending approval count, max step_number) as an Index Only Scan.
+-- Verify with: EXPLAIN ANALYZE SELECT min(step_number) FILTER (WHERE completed IS NOT TRUE)
+--              FROM execution_steps WHERE session_id = 1;
+
+CREATE INDEX IF NOT EXISTS idx_execution_steps_session_progress
+    ON execution_steps(session_id, step_number)
+    INCLUDE (completed, requires_approval, approved);
@@ -0,0 +1,5 @@
+-- Composite index for listing a tenant's infrastructure connections by type
+-- (the connection_type filter now runs in SQL instead of in Python)
+
+CREATE INDEX IF NOT EXISTS idx_infrastructure_connections_tenant_type
+    ON infrastructure_connections(tenant_id, connection_type);
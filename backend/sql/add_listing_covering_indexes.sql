@@ -0,0 +1,19 @@
+-- Covering indexes for the credential / infrastructure connection list endpoints
+-- Lets Postgres answer the listing queries with an Index Only Scan (no heap fetches):
+-- every selected column (including id) is in the index, and the filtered
+-- columns are in the key.
+-- Verify with: EXPLAIN ANALYZE SELECT id, name, ... FROM credentials WHERE tenant_id = 1;
+-- (run VACUUM ANALYZE afterwards so the visibility map allows index-only scans)
+
+-- Recreate so databases that ran an earlier version of this file pick up the new definition
+DROP INDEX IF EXISTS idx_credentials_tenant_env_covering;
+CREATE INDEX IF NOT EXISTS idx_credentials_tenant_env_covering
+    ON credentials(tenant_id, environment)
+    INCLUDE (id, name, credential_type, host, port, database_name, created_at);
+
+-- The connection listing only returns active rows, so the index is partial on is_active
+DROP INDEX IF EXISTS idx_infrastructure_connections_tenant_env_covering;
+CREATE INDEX IF NOT EXISTS idx_infrastructure_connections_tenant_env_covering
+    ON infrastructure_connections(tenant_id, environment, connection_type)
+    INCLUDE (id, name, target_host, target_port, credential_id, created_at)
+    WHERE is_active = true;
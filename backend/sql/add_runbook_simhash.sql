@@ -0,0 +1,17 @@
+-- SimHash fingerprint for runbook near-duplicate lookups
+-- DuplicateDetectionService.check_duplicate probes the band indexes for
+-- candidates and ranks them by Hamming distance:
+--   bit_count((simhash # :q)::bit(64))
+-- Existing rows stay NULL (and are only found by the fallback scan) until
+-- backfilled with: python app/scripts/backfill_runbook_simhash.py
+
+ALTER TABLE runbooks ADD COLUMN IF NOT EXISTS simhash BIGINT;
+ALTER TABLE runbooks ADD COLUMN IF NOT EXISTS simhash_band_0 INTEGER;
+ALTER TABLE runbooks ADD COLUMN IF NOT EXISTS simhash_band_1 INTEGER;
+ALTER TABLE runbooks ADD COLUMN IF NOT EXISTS simhash_band_2 INTEGER;
+ALTER TABLE runbooks ADD COLUMN IF NOT EXISTS simhash_band_3 INTEGER;
+
+CREATE INDEX IF NOT EXISTS idx_runbooks_simhash_band_0 ON runbooks(tenant_id, simhash_band_0);
+CREATE INDEX IF NOT EXISTS idx_runbooks_simhash_band_1 ON runbooks(tenant_id, simhash_band_1);
+CREATE INDEX IF NOT EXISTS idx_runbooks_simhash_band_2 ON runbooks(tenant_id, simhash_band_2);
+CREATE INDEX IF NOT EXISTS idx_runbooks_simhash_band_3 ON runbooks(tenant_id, simhash_band_3);
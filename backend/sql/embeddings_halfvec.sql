@@ -0,0 +1,20 @@
+-- Store embeddings as half-precision halfvec (pgvector >= 0.7.0)
+-- Halves the table and index size and the bytes read per distance computation.
+-- Dimension matches EMBEDDING_DIMENSION (1024, BAAI/bge-large-en-v1.5); adjust
+-- if the embedding model changes.
+-- Queries cast the FP32 query vector server-side: e.embedding <=> '[...]'::halfvec(1024)
+
+-- Indexes on the old vector type cannot survive the type change
+DROP INDEX IF EXISTS embeddings_embedding_idx;
+DROP INDEX IF EXISTS embeddings_embedding_hnsw_idx;
+
+ALTER TABLE embeddings
+    ALTER COLUMN embedding TYPE halfvec(1024) USING embedding::halfvec(1024);
+
+-- Rebuild the similarity index with the halfvec operator class.
+-- These are the small-corpus parameters; PgVectorStore.create_vector_index
+-- compares the index's reloptions with the tier for the current corpus and
+-- rebuilds it (CONCURRENTLY) when they differ.
+CREATE INDEX IF NOT EXISTS embeddings_embedding_hnsw_idx
+    ON embeddings USING hnsw (embedding halfvec_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
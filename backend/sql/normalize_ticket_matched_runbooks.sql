@@ -0,0 +1,29 @@
+-- Normalize tickets.meta_data->'matched_runbooks' to the shape written by
+-- RunbookMatchingService.normalize_matches: a list of objects, each with an
+-- integer "id" (legacy "runbook_id" keys are folded into "id"). Entries that
+-- are not objects or have no numeric id are dropped; non-list values become [].
+-- Safe to re-run.
+
+UPDATE tickets t
+SET meta_data = jsonb_set(
+    t.meta_data::jsonb,
+    '{matched_runbooks}',
+    COALESCE((
+        SELECT jsonb_agg(
+            (elem - 'runbook_id')
+            || jsonb_build_object('id', (COALESCE(elem->>'id', elem->>'runbook_id'))::int)
+            ORDER BY ord
+        )
+        FROM jsonb_array_elements(
+            CASE WHEN jsonb_typeof(t.meta_data::jsonb->'matched_runbooks') = 'array'
+                 THEN t.meta_data::jsonb->'matched_runbooks'
+                 ELSE '[]'::jsonb
+            END
+        ) WITH ORDINALITY AS e(elem, ord)
+        WHERE jsonb_typeof(elem) = 'object'
+          AND COALESCE(elem->>'id', elem->>'runbook_id') ~ '^[0-9]+$'
+    ), '[]'::jsonb)
+)::json
+WHERE t.meta_data IS NOT NULL
+  AND json_typeof(t.meta_data) = 'object'
+  AND t.meta_data::jsonb ? 'matched_runbooks';
@@ -0,0 +1,8 @@
+-- Make runbooks.status a guaranteed column: backfill NULLs, default at the
+-- database level and forbid NULL, so readers can use runbook.status directly.
+-- Safe to re-run.
+
+UPDATE runbooks SET status = 'draft' WHERE status IS NULL;
+
+ALTER TABLE runbooks ALTER COLUMN status SET DEFAULT 'draft';
+ALTER TABLE runbooks ALTER COLUMN status SET NOT NULL;